@@ -0,0 +1,452 @@
+"""
+Benchmarks for the Mercado Libre scraper.
+
+Browser benchmarks run against a local fixture server that serves synthetic
+product pages using the same markup the scraper looks for; the others use
+simulated latencies. Timings never depend on MercadoLibre or the network.
+
+Usage:
+    python benchmarks.py browser-pool --products 20
+    python benchmarks.py scheduler --products 60 --concurrency 3
+    python benchmarks.py fast-mode --products 20
+    python benchmarks.py parser [--pages-dir DIR]
+    python benchmarks.py sentiment --reviews 20000
+    python benchmarks.py insights --products 5000 --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mercadolibre_scraper as scraper
+
+# --- Fixtures ---
+
+
+def fixture_product_html(item_id):
+    """Returns a synthetic product detail page for ``item_id``."""
+    reviews = "\n".join(
+        f'<p class="ui-review-capability-comments__comment__content">'
+        f"Review {n} for item {item_id}: excelente calidad, llegó rápido.</p>"
+        for n in range(8)
+    )
+    images = "\n".join(
+        f'<img src="/static/{item_id}-{n}.png" alt="">' for n in range(6)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Item {item_id}</title></head>
+<body>
+  <nav>
+    <a class="andes-breadcrumb__link" href="/c/1">Electrónica</a>
+    <a class="andes-breadcrumb__link" href="/c/2">Celulares</a>
+  </nav>
+  <span class="ui-pdp-subtitle">Nuevo | +{item_id} vendidos</span>
+  <h1 class="ui-pdp-title">Producto de prueba {item_id}</h1>
+  {images}
+  <p class="ui-pdp-description__content">Descripción del producto {item_id}.</p>
+  {reviews}
+</body>
+</html>"""
+
+
+def fixture_search_html(page, listings=50):
+    """Returns a synthetic search results page with ``listings`` items."""
+    rng = random.Random(page)
+    items = []
+    for n in range(listings):
+        item_id = page * 1000 + n
+        cents = (
+            f'<span class="andes-money-amount__cents">{rng.randint(10, 99)}</span>'
+            if rng.random() < 0.3
+            else ""
+        )
+        items.append(
+            f"""<li class="ui-search-layout__item shops__layout-item">
+  <div class="ui-search-result__wrapper"><div class="poly-card">
+    <div class="poly-card__portada"><img src="/img/{item_id}.webp" alt=""></div>
+    <div class="poly-card__content">
+      <h3 class="poly-component__title-wrapper">
+        <a class="poly-component__title ui-search-link"
+           href="https://www.mercadolibre.com.ar/producto-{item_id}/p/MLA{item_id}?pdp_filters=item_id#position={n}">
+          Producto {item_id} con envío gratis</a></h3>
+      <div class="poly-component__price"><span class="andes-money-amount">
+        <span class="andes-money-amount__currency-symbol">$</span>
+        <span class="andes-money-amount__fraction">{rng.randint(1, 999)}.{rng.randint(100, 999)}</span>{cents}
+      </span></div>
+      <span class="ui-search-reviews__amount">({rng.randint(1, 5000)})</span>
+      <span class="ui-search-item__location">Capital Federal</span>
+      <script type="application/json">{{"tracking": {item_id}}}</script>
+    </div>
+  </div></div>
+</li>"""
+        )
+    return f"""<!DOCTYPE html>
+<html lang="es-AR"><head><meta charset="utf-8"><title>Resultados</title>
+<script>window.__PRELOADED_STATE__ = {{}};</script></head>
+<body><header class="nav-header">MercadoLibre</header>
+<main><ol class="ui-search-layout ui-search-layout--stack">{"".join(items)}</ol></main>
+<footer>{"<p>footer</p>" * 200}</footer></body></html>"""
+
+
+def load_saved_pages(directory):
+    """
+    Loads saved search pages from ``directory``: either plain ``*.html``
+    files or a ``--record`` directory (its HTTP responses are used).
+    """
+    pages = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.endswith(".html"):
+                with open(path, encoding="utf-8") as f:
+                    pages.append(f.read())
+                continue
+            try:
+                with open(path, "rb") as f:
+                    entry = json.loads(zlib.decompress(f.read()))
+            except (OSError, ValueError, zlib.error):
+                continue
+            if entry.get("kind") == "http":
+                pages.append(entry["body"])
+    return pages
+
+
+REVIEW_PHRASES = [
+    "excelente calidad",
+    "muy bueno",
+    "llegó rápido",
+    "el precio es caro",
+    "no funciona el cargador",
+    "tuvo un problema con la batería",
+    "lo recomiendo",
+    "la atención del vendedor fue buena",
+    "es fácil de usar",
+    "mejoró con la actualización",
+    "se mantiene estable",
+    "el envío tardó una semana",
+    "normal para lo que cuesta",
+    "debería traer más accesorios",
+    "el material es resistente",
+    "quedé muy contento",
+]
+
+
+def fixture_reviews(count, seed=0):
+    """Returns ``count`` synthetic Spanish reviews of a few sentences each."""
+    rng = random.Random(seed)
+    return [
+        ". ".join(
+            rng.choice(REVIEW_PHRASES) for _ in range(rng.randint(1, 4))
+        ).capitalize()
+        + "."
+        for _ in range(count)
+    ]
+
+
+def fixture_products(count, reviews_per_product=10, seed=0):
+    """Returns ``count`` scraped products with synthetic reviews and descriptions."""
+    rng = random.Random(seed)
+    reviews = fixture_reviews(count * reviews_per_product, seed)
+    descriptions = [
+        "Material de acero inoxidable, garantía oficial y envío gratis.",
+        "Nuevo en caja, incluye manual y accesorios. Color negro, diseño moderno.",
+        "Talle M, tela de algodón suave y cómodo.",
+        "N/A",
+    ]
+    categories = ["Hogar > Cocina", "Electrónica > Celulares", "Ropa > Remeras"]
+    return [
+        scraper.ProductRecord(
+            f"item/{n}",
+            price=f"{rng.randint(1, 999)}.{rng.randint(100, 999)}",
+            category_path=rng.choice(categories),
+            description=rng.choice(descriptions),
+            review_snippets=reviews[
+                n * reviews_per_product : (n + 1) * reviews_per_product
+            ],
+        )
+        for n in range(count)
+    ]
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serves ``/item/<id>`` product pages from ``fixture_product_html`` and
+    ``/static/*`` as 64 KiB stand-ins for product images.
+    """
+
+    def do_GET(self):
+        if self.path.startswith("/static/"):
+            body = bytes(64 * 1024)
+            content_type = "image/png"
+        else:
+            item_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+            body = fixture_product_html(item_id).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    """Starts the fixture server on a free local port and returns it."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fixture_urls(server, count):
+    """Returns ``count`` product URLs served by ``server``."""
+    host, port = server.server_address[:2]
+    return [f"http://{host}:{port}/item/{n}" for n in range(1, count + 1)]
+
+
+# --- Benchmarks ---
+
+
+async def bench_browser_pool(urls):
+    """Times per-URL browser launches against a shared browser pool."""
+    started = time.perf_counter()
+    for url in urls:
+        await scraper.scrape_product_page(url)
+    per_url_launch = (time.perf_counter() - started) / len(urls)
+
+    started = time.perf_counter()
+    async with scraper.BrowserPool(num_browsers=1, contexts_per_browser=1) as pool:
+        for url in urls:
+            await scraper.scrape_product_page(url, pool)
+    pooled = (time.perf_counter() - started) / len(urls)
+
+    print(f"Products:               {len(urls)}")
+    print(f"Browser per product:    {per_url_launch:.3f} s/product")
+    print(f"Shared browser pool:    {pooled:.3f} s/product")
+    print(f"Overhead saved:         {per_url_launch - pooled:.3f} s/product")
+
+
+async def bench_fast_mode(urls):
+    """Compares bytes and time-to-extract per page with and without fast mode."""
+    for fast in (False, True):
+        async with scraper.BrowserPool(
+            num_browsers=1, contexts_per_browser=1, fast=fast
+        ) as pool:
+            for url in urls:
+                await scraper.scrape_product_page(url, pool)
+            count = len(pool.page_stats)
+            kib = sum(stats["bytes"] for stats in pool.page_stats) / count / 1024
+            seconds = sum(stats["seconds"] for stats in pool.page_stats) / count
+        label = "Fast mode:" if fast else "Default mode:"
+        print(f"{label:<24}{kib:.1f} KiB/page, {seconds:.3f} s/page")
+
+
+def bench_parser(pages, repeat):
+    """Times every installed search parser backend and checks they agree."""
+    print(f"Search pages:           {len(pages)} x {repeat}")
+    results = {}
+    for backend in scraper.available_search_parsers():
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                parsed = [scraper.parse_search_results(html, backend) for html in pages]
+        elapsed = (time.perf_counter() - started) / (len(pages) * repeat)
+        results[backend] = parsed
+        print(f"{backend + ':':<24}{elapsed * 1000:.2f} ms/page")
+    reference = results.pop("bs4")
+    for backend, parsed in results.items():
+        status = "identical" if parsed == reference else "DIFFERENT"
+        print(f"{backend} output vs bs4:  {status}")
+
+
+def bench_sentiment(reviews, repeat):
+    """
+    Times lexicon matching on a concatenated review corpus: one substring
+    scan per lexicon term against the single-pass ``LexiconMatcher``, then
+    ``analyze_sentiment`` on the whole corpus, per-review batch scoring and
+    customer feedback extraction.
+    """
+    lexicons = {
+        "positive": scraper.POSITIVE_WORDS,
+        "negative": scraper.NEGATIVE_WORDS,
+        **{name: data["words"] for name, data in scraper.EMOTIONS.items()},
+        **{name: data["keywords"] for name, data in scraper.SENTIMENT_CONTEXTS.items()},
+        **scraper.TREND_INDICATORS,
+    }
+    text = " ".join(reviews)
+    print(f"Reviews:                {len(reviews)} ({len(text) / 1024:.0f} KiB)")
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        text_lower = text.lower()
+        for terms in lexicons.values():
+            {term for term in terms if term in text_lower}
+    scans = (time.perf_counter() - started) / repeat
+
+    matcher = scraper.LexiconMatcher(lexicons)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        matcher.match(text.lower())
+    single_pass = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        scraper.analyze_sentiment(text)
+    full = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        batch = scraper.SentimentBatch(reviews)
+        batch.scores()
+    batched = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    scraper.extract_customer_feedback(reviews)
+    feedback = time.perf_counter() - started
+
+    print(f"Per-term scans:         {scans * 1000:.1f} ms")
+    print(f"Single-pass matcher:    {single_pass * 1000:.1f} ms")
+    print(f"analyze_sentiment:      {full * 1000:.1f} ms")
+    print(f"Per-review batch:       {batched * 1000:.1f} ms")
+    print(
+        f"Customer feedback:      {feedback * 1000:.1f} ms "
+        f"({len(reviews) / feedback:,.0f} reviews/s)"
+    )
+
+
+def bench_insights(products, workers):
+    """Times ``extract_insights`` for each worker count and checks the results agree."""
+    print(f"Products:               {len(products)} (CPUs: {os.cpu_count()})")
+    reference = None
+    for count in workers:
+        started = time.perf_counter()
+        insights = scraper.extract_insights(products, count)
+        elapsed = time.perf_counter() - started
+        encoded = json.dumps(insights, sort_keys=True)
+        reference = reference or encoded
+        status = "identical" if encoded == reference else "DIFFERENT"
+        print(f"{f'{count} worker(s):':<24}{elapsed:.3f} s ({status})")
+
+
+async def bench_scheduler(count, concurrency):
+    """
+    Compares fixed batches with the sliding-window scheduler.
+
+    Page latencies are simulated with a long tail (the slowest page is about
+    4x the median), so only scheduling differs between the two runs.
+    """
+    rng = random.Random(0)
+    latencies = {
+        f"item/{n}": rng.choice([0.05, 0.05, 0.05, 0.06, 0.2]) for n in range(count)
+    }
+    products = [scraper.ProductRecord(url) for url in latencies]
+
+    async def fake_scrape(url, pool=None):
+        await asyncio.sleep(latencies[url])
+        return {}
+
+    real_scrape = scraper.scrape_product_page
+    scraper.scrape_product_page = fake_scrape
+    try:
+        started = time.perf_counter()
+        for i in range(0, count, concurrency):
+            batch = products[i : i + concurrency]
+            await asyncio.gather(*(fake_scrape(p.url) for p in batch))
+        batched = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await scraper.scrape_product_pages(products, None, concurrency)
+        sliding = time.perf_counter() - started
+    finally:
+        scraper.scrape_product_page = real_scrape
+
+    print(f"Products:               {count} (concurrency {concurrency})")
+    print(f"Fixed batches:          {batched:.3f} s")
+    print(f"Sliding window:         {sliding:.3f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mercado Libre scraper benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    pool_parser = subparsers.add_parser(
+        "browser-pool", help="Per-product overhead of the shared browser pool"
+    )
+    pool_parser.add_argument("--products", type=int, default=20)
+
+    fast_parser = subparsers.add_parser(
+        "fast-mode", help="Transfer size and time-to-extract with --fast"
+    )
+    fast_parser.add_argument("--products", type=int, default=20)
+
+    parser_parser = subparsers.add_parser(
+        "parser", help="Search page parser backends on saved or synthetic pages"
+    )
+    parser_parser.add_argument(
+        "--pages-dir",
+        default=None,
+        help="Directory of saved *.html search pages or a --record directory",
+    )
+    parser_parser.add_argument("--pages", type=int, default=10)
+    parser_parser.add_argument("--repeat", type=int, default=5)
+
+    sentiment_parser = subparsers.add_parser(
+        "sentiment", help="Lexicon matching on a long review corpus"
+    )
+    sentiment_parser.add_argument("--reviews", type=int, default=20000)
+    sentiment_parser.add_argument("--repeat", type=int, default=3)
+
+    insights_parser = subparsers.add_parser(
+        "insights", help="extract_insights scaling across worker processes"
+    )
+    insights_parser.add_argument("--products", type=int, default=5000)
+    insights_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+
+    scheduler_parser = subparsers.add_parser(
+        "scheduler", help="Fixed batches vs sliding-window detail scheduling"
+    )
+    scheduler_parser.add_argument("--products", type=int, default=60)
+    scheduler_parser.add_argument("--concurrency", type=int, default=3)
+
+    args = parser.parse_args()
+    scraper.DEBUG = False
+
+    if args.benchmark == "browser-pool":
+        server = start_fixture_server()
+        try:
+            asyncio.run(bench_browser_pool(fixture_urls(server, args.products)))
+        finally:
+            server.shutdown()
+    elif args.benchmark == "fast-mode":
+        server = start_fixture_server()
+        try:
+            asyncio.run(bench_fast_mode(fixture_urls(server, args.products)))
+        finally:
+            server.shutdown()
+    elif args.benchmark == "parser":
+        pages = (
+            load_saved_pages(args.pages_dir)
+            if args.pages_dir
+            else [fixture_search_html(page) for page in range(args.pages)]
+        )
+        bench_parser(pages, args.repeat)
+    elif args.benchmark == "sentiment":
+        bench_sentiment(fixture_reviews(args.reviews), args.repeat)
+    elif args.benchmark == "insights":
+        bench_insights(fixture_products(args.products), args.workers)
+    elif args.benchmark == "scheduler":
+        asyncio.run(bench_scheduler(args.products, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
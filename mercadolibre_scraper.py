@@ -1,12 +1,27 @@
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
 import time
 import random
 import csv
 import json
+import sqlite3
+import hashlib
+import os
+import zlib
 import re
-from urllib.parse import urljoin, urlparse
-from collections import Counter
+from urllib.parse import (
+    urlparse,
+    urlencode,
+    parse_qsl,
+    parse_qs,
+    unquote,
+)
+from collections import Counter, deque
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+from fractions import Fraction
+from email.utils import parsedate_to_datetime
+from datetime import UTC, datetime
 from textblob import TextBlob  # For sentiment analysis and keyword extraction
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -15,8 +30,35 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from playwright.async_api import async_playwright
+from urllib.request import pathname2url
+from playwright.async_api import Error as PlaywrightError, async_playwright
+from contextlib import ExitStack, asynccontextmanager, suppress
 import asyncio
+import copy
+import math
+import sys
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Optional faster HTML parsers for search pages; BeautifulSoup is the fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Optional typed columnar export of the scraped products
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 
 # Configuration
@@ -64,6 +106,56 @@ HEADERS = [
     },
 ]
 
+# Product detail page selectors, tried in order
+TITLE_SELECTOR = "h1.ui-pdp-title"
+DESCRIPTION_SELECTORS = [
+    "div.item-description__text",
+    "p.ui-pdp-description__content",
+    "div.ui-pdp-description__content",
+    "div.ui-pdp-description__content__container",
+    "div.ui-pdp-description__content__container__text",
+]
+SALES_SELECTORS = [
+    "span.ui-pdp-subtitle",
+    "p.ui-pdp-subtitle",
+    "span.ui-pdp-header__subtitle",
+    "div.ui-pdp-header__info",
+    "div.ui-pdp-seller__sales-info",
+    "span.ui-pdp-seller__sales-info__text",
+]
+REVIEW_SELECTORS = [
+    "p.ui-review-capability-comments__comment__content",
+    "div.ui-review-capability__comment__content",
+    "p.ui-review-capability__comment__content",
+]
+BREADCRUMB_SELECTOR = "a.andes-breadcrumb__link"
+
+# Match various sales number formats ("+500 vendidos", "+5mil vendidos", ...)
+SALES_PATTERNS = [
+    re.compile(
+        r"\+?(\d{1,3}(?:\.\d{3})+|\d+)\s+"
+        r"(?:vendidos|ventas|unidades vendidas|unidades|compras|compradores)",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"\+?(\d+(?:[.,]\d+)?)\s*(?:mil|miles)\s+(?:vendidos|ventas)", re.IGNORECASE
+    ),
+    re.compile(
+        r"más de\s+(\d{1,3}(?:\.\d{3})+|\d+)\s+(?:vendidos|ventas)", re.IGNORECASE
+    ),
+]
+
+# Fast mode: resource types that never affect the extracted fields, and the
+# hosts whose requests are let through (everything else is third-party)
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "texttrack", "manifest"}
+FIRST_PARTY_HOSTS = (
+    "mercadolibre.com.ar",
+    "mercadolibre.com",
+    "mlstatic.com",
+    "127.0.0.1",
+    "localhost",
+)
+
 # --- Utility Functions ---
 
 
@@ -78,153 +170,1375 @@ def debug_print(message):
         print(f"[DEBUG] {message}")
 
 
-def fetch_page(url, retries=3, backoff_factor=0.5):
-    """Fetches a web page with retries and exponential backoff."""
+def is_first_party(url):
+    """Returns True if ``url`` is served by MercadoLibre (or a local fixture)."""
+    host = urlparse(url).hostname or ""
+    return any(
+        host == allowed or host.endswith("." + allowed) for allowed in FIRST_PARTY_HOSTS
+    )
+
+
+async def route_fast_mode(route):
+    """Playwright route handler that drops non-essential and third-party requests."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or (
+        request.resource_type != "document" and not is_first_party(request.url)
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# --- Rate Limiting ---
+
+# Statuses that mean the server wants us to slow down
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value, default=None):
+    """Parses a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Token bucket for a single host.
+
+    Refills at ``rate`` tokens per second up to ``burst``. Acquiring while
+    tokens are available returns immediately; otherwise it waits only as long
+    as needed for the next token. ``pause`` empties the bucket and blocks it
+    until the server-requested time has passed.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Takes one token, sleeping only when the bucket is empty or paused."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """Blocks the bucket for ``seconds`` and drops any saved-up burst."""
+        now = time.monotonic()
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+        self.updated = max(now, self.blocked_until)
+
+
+class RateLimiter:
+    """
+    One token bucket per host, shared by search fetches and browser
+    navigations so both draw from the same request budget.
+
+    Callers ``wait`` before every request and report 429/503 responses via
+    ``throttle``, which pauses the host for the ``Retry-After`` time (or
+    ``default_backoff`` seconds when the server does not say).
+    """
+
+    def __init__(self, rate=1.0, burst=3, default_backoff=10.0):
+        self.rate = rate
+        self.burst = burst
+        self.default_backoff = default_backoff
+        self.throttled = 0
+        self._buckets = {}
+
+    def _bucket(self, url):
+        host = urlparse(url).hostname or ""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def wait(self, url):
+        """Waits until a request to ``url``'s host fits the budget."""
+        await self._bucket(url).acquire()
+
+    def throttle(self, url, status, retry_after=None):
+        """
+        Pauses ``url``'s host if ``status`` is a throttling response.
+        Returns True when the request should be retried.
+        """
+        if status not in THROTTLE_STATUSES:
+            return False
+        delay = parse_retry_after(retry_after, self.default_backoff)
+        self.throttled += 1
+        print(f"Got {status} from {urlparse(url).hostname}, pausing for {delay:.1f} s")
+        self._bucket(url).pause(delay)
+        return True
+
+
+# --- Response Cache ---
+
+
+def normalize_url(url):
+    """Lowercases scheme and host, drops the fragment and sorts the query."""
+    parsed = urlparse(url.strip())
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        path=parsed.path or "/",
+        query=query,
+        fragment="",
+    ).geturl()
+
+
+class ResponseCache:
+    """
+    On-disk cache of page bodies.
+
+    Entries are addressed by the SHA-256 of ``kind`` plus the normalized URL,
+    so a search page fetched over HTTP and a product page rendered by the
+    browser never collide. Bodies are stored zlib-compressed, expire after
+    ``ttl`` seconds (never when ``ttl`` is None) and the least recently used
+    entries are evicted once the directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, directory, ttl=None, max_bytes=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                yield from (e for e in os.scandir(shard.path) if e.is_file())
+
+    def _path(self, url, kind):
+        key = hashlib.sha256(f"{kind}:{normalize_url(url)}".encode())
+        digest = key.hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get(self, url, kind="http"):
+        """Returns the cached body for ``url`` or None on a miss."""
+        path = self._path(url, kind)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        if self.ttl is not None and time.time() - entry["stored_at"] > self.ttl:
+            self.misses += 1
+            return None
+        os.utime(path)  # Mark as recently used for LRU eviction
+        self.hits += 1
+        return entry["body"]
+
+    def set(self, url, body, kind="http"):
+        """Stores ``body`` for ``url``, evicting old entries if needed."""
+        path = self._path(url, kind)
+        data = zlib.compress(
+            json.dumps(
+                {"url": url, "kind": kind, "stored_at": time.time(), "body": body},
+                ensure_ascii=False,
+            ).encode("utf-8")
+        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            self._size -= os.path.getsize(path)
+        except OSError:
+            pass
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._size += len(data)
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Deletes least recently used entries until 90% of ``max_bytes``."""
+        target = self.max_bytes * 0.9
+        for entry in sorted(self._entries(), key=lambda e: e.stat().st_mtime):
+            if self._size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except OSError:
+                continue
+
+    def print_stats(self):
+        """Prints hit/miss counters for this run."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        print(
+            f"Cache: {self.hits} hit(s), {self.misses} miss(es) ({rate:.0f}% hit rate), "
+            f"{self._size / 1024 / 1024:.1f} MiB on disk"
+        )
+
+
+# --- Record / Replay ---
+
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost")
+
+
+class ReplayServer:
+    """
+    Local stand-in for MercadoLibre product pages during ``--replay`` runs.
+
+    Serves rendered pages from a recording archive (a ``ResponseCache``
+    written by ``--record``) at ``/replay?url=<original url>``; pages that
+    were never recorded get a 404.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self._server = None
+
+    def start(self):
+        """Starts serving on a free loopback port in a background thread."""
+        archive = self.archive
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = parse_qs(urlparse(self.path).query).get("url", [""])[0]
+                html = archive.get(url, "rendered") if url else None
+                if html is None:
+                    self.send_error(404, "Not recorded")
+                    return
+                body = html.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        debug_print(f"Replay server listening on port {self._server.server_port}")
+        return self
+
+    def close(self):
+        """Stops the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def url_for(self, url):
+        """Local URL that serves the recorded page for ``url``."""
+        port = self._server.server_port
+        return f"http://127.0.0.1:{port}/replay?{urlencode({'url': url})}"
+
+
+async def route_offline(route):
+    """Playwright route handler that only lets loopback requests through."""
+    if urlparse(route.request.url).hostname in LOOPBACK_HOSTS:
+        await route.continue_()
+    else:
+        await route.abort()
+
+
+# --- HTTP Client ---
+
+
+class HttpClient:
+    """
+    Shared async HTTP client for search pages and other HTTP-only fetches.
+
+    Wraps one aiohttp session whose connector keeps connections alive across
+    requests (no new TCP+TLS handshake per page) and caps the number of
+    requests in flight. Requests are paced by ``rate_limiter`` and answered
+    from ``cache`` when given. Bodies are saved to ``recorder`` for later
+    replay; with ``replay`` set, pages are served from that recording and
+    the network is never used.
+    """
+
+    def __init__(
+        self,
+        max_connections=10,
+        max_in_flight=4,
+        timeout=10,
+        rate_limiter=None,
+        cache=None,
+        recorder=None,
+        replay=None,
+    ):
+        self.max_connections = max_connections
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.recorder = recorder
+        self.replay = replay
+        self._session = None
+        self._in_flight = None
+
+    async def start(self):
+        """Opens the pooled session."""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections, ttl_dns_cache=300, keepalive_timeout=30
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def close(self):
+        """Closes the session and its pooled connections."""
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def get(self, url, headers=None):
+        """
+        GETs ``url`` and returns ``(status, headers, text)``.
+        Raises ``aiohttp.ClientResponseError`` for 4xx/5xx responses.
+        """
+        async with self._in_flight, self._session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            return response.status, dict(response.headers), await response.text()
+
+
+async def fetch_page(url, client=None, retries=3, backoff_factor=0.5, cache_if=None):
+    """
+    Fetches a web page with retries and exponential backoff.
+
+    Requests go through ``client``; when no client is given a short-lived one
+    is opened just for this URL. Responses are only kept in the client's
+    cache if ``cache_if(content)`` is true; by default every page that does
+    not ``looks_blocked`` is kept.
+    """
+    if client is None:
+        async with HttpClient() as own_client:
+            return await fetch_page(url, own_client, retries, backoff_factor, cache_if)
+
+    if client.replay:
+        content = client.replay.get(url)
+        if content is None:
+            print(f"Not in recording: {url}")
+        return content
+
+    if client.cache:
+        content = client.cache.get(url)
+        if content is not None:
+            debug_print(f"Cache hit: {url}")
+            if client.recorder:
+                client.recorder.set(url, content)
+            return content
+
+    limiter = client.rate_limiter
     for i in range(retries):
         try:
             headers = get_random_header()
             debug_print(f"Using headers: {headers}")
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-            debug_print(f"Response status code: {response.status_code}")
-            debug_print(f"Response headers: {dict(response.headers)}")
-            content = response.text
-            debug_print("Using requests auto-decoded content")
-            time.sleep(random.uniform(1, 3))  # Rate limiting
+            if limiter:
+                await limiter.wait(url)
+            status, response_headers, content = await client.get(url, headers=headers)
+            debug_print(f"Response status code: {status}")
+            debug_print(f"Response headers: {response_headers}")
+            # Block pages would otherwise be served again for the whole TTL
+            if client.cache and (cache_if or not_blocked)(content):
+                client.cache.set(url, content)
+            if client.recorder:
+                client.recorder.set(url, content)
             return content
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching {url}: {e}")
+        except (aiohttp.ClientError, TimeoutError) as e:
+            print(f"Error fetching {url}: {str(e) or type(e).__name__}")
+            if isinstance(e, aiohttp.ClientResponseError) and limiter:
+                retry_after = (e.headers or {}).get("Retry-After")
+                if limiter.throttle(url, e.status, retry_after) and i < retries - 1:
+                    continue  # The limiter already holds the host back
             if i < retries - 1:
                 sleep_time = backoff_factor * (2**i)
                 print(f"Retrying in {sleep_time:.2f} seconds...")
-                time.sleep(sleep_time)
+                await asyncio.sleep(sleep_time)
             else:
                 print(f"Failed to fetch {url} after {retries} retries.")
                 return None
 
 
+# --- Checkpoints ---
+
+
+class Checkpoint:
+    """
+    JSON Lines journal of finished search pages and products, used to resume
+    interrupted runs; ``product()`` reads a product's record back.
+    """
+
+    def __init__(self, path, resume=False, sync_every=20):
+        self.path = path
+        self.sync_every = max(1, sync_every)
+        self.pages = {}
+        # url -> (status, byte offset of the latest record in the journal)
+        self.products = {}
+        self._written = 0
+        if resume and os.path.exists(path):
+            self._load()
+        with ExitStack() as files:
+            self._file = files.enter_context(
+                open(path, "a" if resume else "w", encoding="utf-8", newline="")
+            )
+            self._reader = files.enter_context(open(path, "rb"))
+            self._files = files.pop_all()
+        self._offset = self._file.tell()
+        if resume and self._offset and not self._ends_with_newline():
+            self._file.write("\n")  # The last record was cut off mid-write
+            self._offset += 1
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                position, offset = offset, offset + len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "search_page":
+                    self.pages[(record["keyword"], record["page"])] = record
+                elif record.get("type") == "product":
+                    self.products[record["url"]] = (record["status"], position)
+
+    def search_page(self, keyword, page):
+        """The latest record for search result ``page`` of ``keyword``, if any."""
+        return self.pages.get((keyword, page))
+
+    def product_status(self, url):
+        """The status of the latest record for product ``url``, if any."""
+        entry = self.products.get(url)
+        return entry[0] if entry else None
+
+    def product(self, url):
+        """The latest record for product ``url``, read back from the journal, if any."""
+        entry = self.products.get(url)
+        if entry is None:
+            return None
+        self._reader.seek(entry[1])
+        return json.loads(self._reader.readline())
+
+    def record_search_page(self, keyword, page, status, products=None):
+        record = {
+            "type": "search_page",
+            "keyword": keyword,
+            "page": page,
+            "status": status,
+            "products": products or [],
+        }
+        self.pages[(keyword, page)] = record
+        self._append(record)
+
+    def record_product(self, url, status, product):
+        record = {"type": "product", "url": url, "status": status, "product": product}
+        self.products[url] = (status, self._offset)
+        self._append(record)
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self._offset += len(line.encode("utf-8"))
+        self._written += 1
+        if self._written % self.sync_every == 0:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Fsyncs and closes the journal."""
+        if self._file and not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._files.close()
+
+    def print_stats(self):
+        """Prints how much work the journal holds."""
+        statuses = Counter(status for status, _ in self.products.values())
+        print(
+            f"Checkpoint {self.path}: {len(self.pages)} search page(s), "
+            f"{statuses['ok']} product(s) done, {statuses['failed']} failed"
+        )
+
+
 # --- Scraper Functions ---
 
 
-def scrape_search_results(keyword, num_pages=1):
+async def scrape_search_results(
+    keyword, num_pages=1, client=None, parser="auto", checkpoint=None
+):
     """
     Scrapes product data from Mercado Libre search result pages.
     Extracts product URL, price, location, and shipping info.
+
+    Result pages are requested through the shared ``client`` and parsed in
+    page order with the ``parser`` backend. The first page is fetched on its
+    own; once a page has listings the remaining ones are requested together.
+    Pages already done in ``checkpoint`` are taken from it, and every fetched
+    page is recorded.
     """
     products_data = []
     print(f"Scraping search results for '{keyword}' across {num_pages} page(s)...")
 
-    for page in range(num_pages):
-        search_url = f"{BASE_URL}{keyword}_Desde_{page * 50 + 1}"  # Mercado Libre uses 50 results per page
-        print(f"Fetching search page: {search_url}")
-        html_content = fetch_page(search_url)
+    search_urls = [
+        f"{BASE_URL}{keyword}_Desde_{page * 50 + 1}"  # Mercado Libre uses 50 results per page
+        for page in range(num_pages)
+    ]
+    done = {}
+    if checkpoint:
+        for page in range(num_pages):
+            record = checkpoint.search_page(keyword, page)
+            if record and record["status"] in ("ok", "empty"):
+                done[page] = record
+    pending = [page for page in range(num_pages) if page not in done]
+    pages_html = {}
+
+    async def fetch(pages):
+        for page in pages:
+            print(f"Fetching search page: {search_urls[page]}")
+        contents = await asyncio.gather(
+            *(
+                fetch_page(
+                    search_urls[page],
+                    client,
+                    # Empty or blocked result pages are not worth keeping
+                    cache_if=lambda html: has_search_listings(html, parser),
+                )
+                for page in pages
+            )
+        )
+        pages_html.update(zip(pages, contents))
 
+    found_listings = False
+    for page, search_url in enumerate(search_urls):
+        if page in done:
+            if done[page]["status"] == "empty":
+                break
+            products_data.extend(
+                ProductRecord.from_dict(product) for product in done[page]["products"]
+            )
+            found_listings = True
+            continue
+        if page not in pages_html:
+            # Pages go out one at a time until one has listings, so a blocked
+            # or empty search costs a single request; the rest then go together
+            await fetch([p for p in pending if p >= page] if found_listings else [page])
+        html_content = pages_html[page]
         if html_content:
-            soup = BeautifulSoup(html_content, "html.parser")
-
-            # Try different possible selectors for product listings
-            product_listings = soup.find_all("li", class_="ui-search-layout__item")
-            if not product_listings:
-                product_listings = soup.find_all(
-                    "div", class_="ui-search-result__content"
-                )
-            if not product_listings:
-                product_listings = soup.find_all("div", class_="ui-search-result")
-
-            if not product_listings:
-                print("No product listings found. Possible reasons:")
-                print("1. The page structure has changed")
-                print("2. The search returned no results")
-                print("3. The request was blocked")
-                print("\nHTML content preview:")
-                print(html_content[:500])  # Print first 500 chars for debugging
+            page_products = parse_search_results(html_content, parser)
+            if page_products is None:
+                if checkpoint:
+                    # A block page or an empty first page is more likely
+                    # throttling than the end of the results: retry on resume
+                    blocked = page == 0 or looks_blocked(html_content)
+                    checkpoint.record_search_page(
+                        keyword, page, "failed" if blocked else "empty"
+                    )
                 break
+            products_data.extend(page_products)
+            found_listings = True
+            if checkpoint:
+                checkpoint.record_search_page(
+                    keyword,
+                    page,
+                    "ok",
+                    [product.to_dict() for product in page_products],
+                )
+        else:
+            print(f"Could not fetch search page {search_url}. Skipping.")
+            if checkpoint:
+                checkpoint.record_search_page(keyword, page, "failed")
 
-            for product in product_listings:
-                try:
-                    # Get product URL - try multiple possible selectors
-                    url_tag = (
-                        product.find("a", class_="ui-search-item__group__element")
-                        or product.find("a", class_="ui-search-link")
-                        or product.find("a", href=True)
-                    )
+    return products_data
+
+
+# --- Item IDs ---
+
+# Item IDs in listing paths ("/MLA-1234567890-titulo-_JM") and catalog product
+# IDs in "/p/MLA15149561" pages; a catalog page may name the item it shows
+ITEM_ID_RE = re.compile(r"(?:^|/)MLA-?(\d+)")
+CATALOG_ID_RE = re.compile(r"/p/MLA-?(\d+)")
+ITEM_QUERY_RE = re.compile(r"(?:^|&)(?:wid=|pdp_filters=.*?item_id:)MLA-?(\d+)")
+
+# Query parameters that select what a product page shows; everything else
+# (tracking_id, position, search_layout, is_advertising, ...) is tracking
+CANONICAL_QUERY_PARAMS = ("wid", "pdp_filters")
+
+
+def canonical_item_id(url):
+    """
+    The MercadoLibre ID a product URL points at, or None.
+
+    Listing pages and catalog pages that name a specific item give the item
+    ID (``MLA1234567890``); other catalog pages give ``p/`` plus the catalog
+    ID (``p/MLA15149561``), so the two kinds of ID never collide.
+    """
+    parsed = urlparse(url)
+    match = ITEM_QUERY_RE.search(unquote(parsed.query))
+    if match:
+        return f"MLA{match.group(1)}"
+    match = CATALOG_ID_RE.search(parsed.path)
+    if match:
+        return f"p/MLA{match.group(1)}"
+    match = ITEM_ID_RE.search(parsed.path)
+    if match:
+        return f"MLA{match.group(1)}"
+    return None
+
+
+def canonical_product_url(url):
+    """``url`` over https with the fragment and tracking parameters removed."""
+    parsed = urlparse(url.strip())
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parsed.query)
+            if name in CANONICAL_QUERY_PARAMS
+        )
+    )
+    return parsed._replace(
+        scheme="https", netloc=parsed.netloc.lower(), query=query, fragment=""
+    ).geturl()
+
+
+def item_key(url):
+    """The key products are deduplicated by: the item ID, or ``url`` without one."""
+    return canonical_item_id(url) or url
+
+
+def dedupe_products(products_data):
+    """
+    Drops listings of products already seen earlier in ``products_data``.
+
+    Listings are matched by ``canonical_item_id``, or by URL when it has no
+    ID. Returns the unique products in first-seen order and the number of
+    listings dropped. A kept listing's missing fields are filled in from its
+    duplicates.
+    """
+    unique = {}
+    for product in products_data:
+        kept = unique.setdefault(item_key(product.url), product)
+        if kept is not product:
+            kept.fill_missing(product)
+    return list(unique.values()), len(products_data) - len(unique)
 
-                    if not url_tag or not url_tag.get("href"):
-                        print("Skipping product: No valid URL found")
-                        continue
-
-                    url = url_tag["href"]
-
-                    # Only process real product URLs
-                    parsed_url = urlparse(url)
-                    # Aceptamos solo dominios de MercadoLibre Argentina
-                    if "mercadolibre.com.ar" not in parsed_url.netloc:
-                        print(f"Skipping non-MercadoLibre URL: {url}")
-                        continue
-
-                    # Aceptamos productos si la URL contiene '/articulo/', '/MLA-' o '/p/MLA'
-                    if not ("/articulo/" in url or "/MLA-" in url or "/p/MLA" in url):
-                        print(f"Skipping non-product URL: {url}")
-                        continue
-
-                    # Initialize product data with required fields
-                    product_data = {
-                        "url": url,
-                        "price": "N/A",
-                        "category_path": "N/A",
-                        "description": "N/A",
-                        "num_sales": "N/A",
-                        "review_snippets": [],
-                    }
-
-                    # Price selectors
-                    price_whole_tag = product.find(
-                        "span", class_="andes-money-amount__fraction"
-                    ) or product.find("span", class_="price-tag-fraction")
-                    price_decimals_tag = product.find(
-                        "span", class_="andes-money-amount__cents"
-                    ) or product.find("span", class_="price-tag-cents")
-                    if price_whole_tag:
-                        price = price_whole_tag.get_text(strip=True)
-                        if price_decimals_tag:
-                            price += "." + price_decimals_tag.get_text(strip=True)
-                        product_data["price"] = price
-
-                    # Location - only include if not N/A
-                    location_tag = product.find(
-                        "span", class_="ui-search-item__group__element--location"
-                    ) or product.find("span", class_="ui-search-item__location")
-                    location = (
-                        location_tag.get_text(strip=True) if location_tag else "N/A"
-                    )
-                    if location != "N/A":
-                        product_data["location"] = location
-
-                    # Product reviews summary - only include if not N/A
-                    product_reviews_summary_tag = product.find(
-                        "span", class_="ui-search-reviews__amount"
-                    ) or product.find("span", class_="ui-search-item__reviews")
-                    product_reviews_summary = (
-                        product_reviews_summary_tag.get_text(strip=True)
-                        if product_reviews_summary_tag
-                        else "N/A"
-                    )
-                    if product_reviews_summary != "N/A":
-                        product_data["product_reviews_summary"] = (
-                            product_reviews_summary
-                        )
 
-                    products_data.append(product_data)
+# --- Product Records ---
 
-                except Exception as e:
-                    print(f"Error processing product: {str(e)}")
+# Listing prices: dots separate thousands, a last group of one or two digits
+# after a dot or comma holds the cents ("1.299.999", "1.299.99", "1.299,99")
+PRICE_RE = re.compile(r"(\d[\d.]*?)(?:[.,](\d{1,2}))?")
+
+
+def parse_price(value):
+    """The numeric value of a scraped price, or None when it has none."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = PRICE_RE.fullmatch(value.strip())
+    if not match:
+        return None
+    whole, cents = match.groups()
+    return float(whole.replace(".", "") + "." + (cents or "0"))
+
+
+def parse_count(value):
+    """The integer value of a scraped count such as ``num_sales``, or None."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_price(price):
+    """``price`` written the way listings show it: "1.299.999", or "1.299.99"."""
+    whole, cents = divmod(round(price * 100), 100)
+    text = f"{whole:,}".replace(",", ".")
+    return f"{text}.{cents:02d}" if cents else text
+
+
+# Fields ``to_dict`` leaves out when missing instead of writing "N/A"
+OPTIONAL_PRODUCT_FIELDS = ("location", "product_reviews_summary", "title")
+
+
+class ProductRecord:
+    """
+    One scraped product.
+
+    Prices and sales counts are stored parsed (a float and an int), category
+    paths and locations are interned since a few of them repeat across
+    thousands of products, and missing values are None. A price text that
+    ``format_price`` would not give back as scraped ("1.299.00", or one
+    that does not parse) is also kept in ``raw_price``. ``__slots__`` keeps
+    a record a fraction of the size of the equivalent dict. Detail pages
+    enrich a record in place through ``update()``; ``to_dict()`` gives the
+    dict written to CSV and JSON, with strings and "N/A" as before.
+    """
+
+    # In output order; to_dict() follows it
+    __slots__ = (
+        "url",
+        "price",
+        "category_path",
+        "description",
+        "num_sales",
+        "review_snippets",
+        "location",
+        "product_reviews_summary",
+        "title",
+        "raw_price",
+    )
+
+    def __init__(self, url, **fields):
+        self.url = url
+        self.price = self.num_sales = self.raw_price = None
+        self.category_path = self.description = self.location = None
+        self.product_reviews_summary = self.title = None
+        self.review_snippets = []
+        self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a record from a product dict as written by ``to_dict()``."""
+        return cls(data["url"], **{k: v for k, v in data.items() if k != "url"})
+
+    def update(self, fields):
+        """
+        Sets every field in ``fields``, a dict of scraped values where "N/A"
+        means missing. Unknown keys are ignored.
+        """
+        for field, value in fields.items():
+            if field not in self.__slots__ or field in ("url", "raw_price"):
+                continue
+            if value == "N/A":
+                value = None
+                if field == "price":
+                    self.raw_price = None
+            elif field == "price":
+                text = value
+                value = parse_price(text)
+                self.raw_price = (
+                    text
+                    if isinstance(text, str)
+                    and (value is None or format_price(value) != text)
+                    else None
+                )
+            elif field == "num_sales":
+                value = parse_count(value)
+            elif field == "review_snippets":
+                value = list(value) if isinstance(value, list) else []
+            elif field in ("category_path", "location") and isinstance(value, str):
+                value = sys.intern(value)
+            if field == "review_snippets" and value is None:
+                value = []
+            setattr(self, field, value)
+
+    def fill_missing(self, other):
+        """Copies the fields this record lacks from ``other``, a duplicate."""
+        if self.price is None and self.raw_price is None:
+            self.price, self.raw_price = other.price, other.raw_price
+        for field in self.__slots__:
+            if field in ("price", "raw_price"):
+                continue
+            if getattr(self, field) is None and getattr(other, field) is not None:
+                setattr(self, field, getattr(other, field))
+
+    def to_dict(self):
+        """
+        The product as the dict the output writers expect: the price as
+        listed ("1.299.999"), the sales count as a string, "N/A" for missing
+        values and no key at all for missing ``OPTIONAL_PRODUCT_FIELDS``.
+        """
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if field == "raw_price":
+                continue
+            if field == "price" and self.raw_price is not None:
+                value = self.raw_price
+            elif value is None:
+                if field in OPTIONAL_PRODUCT_FIELDS:
                     continue
+                value = "N/A"
+            elif field == "price":
+                value = format_price(value)
+            elif field == "num_sales":
+                value = str(value)
+            data[field] = value
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, ProductRecord):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    def __repr__(self):
+        return (
+            f"ProductRecord({self.url!r}, price={self.price!r}, title={self.title!r})"
+        )
+
+
+# --- Search Page Parsing ---
+
+# Listing containers, tried in order until one matches
+LISTING_SELECTORS = [
+    ("li", "ui-search-layout__item"),
+    ("div", "ui-search-result__content"),
+    ("div", "ui-search-result"),
+]
+
+# Per-listing fields as (tag, class) fallback chains; the first match wins
+LISTING_URL_SELECTORS = [
+    ("a", "ui-search-item__group__element"),
+    ("a", "ui-search-link"),
+]
+LISTING_TEXT_SELECTORS = {
+    "price_whole": [
+        ("span", "andes-money-amount__fraction"),
+        ("span", "price-tag-fraction"),
+    ],
+    "price_cents": [
+        ("span", "andes-money-amount__cents"),
+        ("span", "price-tag-cents"),
+    ],
+    "location": [
+        ("span", "ui-search-item__group__element--location"),
+        ("span", "ui-search-item__location"),
+    ],
+    "reviews_summary": [
+        ("span", "ui-search-reviews__amount"),
+        ("span", "ui-search-item__reviews"),
+    ],
+}
+
+# Elements whose text BeautifulSoup leaves out of get_text()
+NON_TEXT_TAGS = ("script", "style", "template")
+
+
+class Bs4ListingParser:
+    """
+    BeautifulSoup backend. Parses only the ``ui-search-layout__item``
+    subtrees and falls back to a full tree for older layouts.
+    """
+
+    name = "bs4"
+
+    def listings(self, html_content):
+        tag, class_name = LISTING_SELECTORS[0]
+        # The strainer sees the raw class attribute, before it is split
+        strainer = SoupStrainer(
+            tag,
+            attrs={
+                "class": lambda value: (
+                    bool(value)
+                    and class_name
+                    in (value.split() if isinstance(value, str) else value)
+                )
+            },
+        )
+        soup = BeautifulSoup(html_content, "html.parser", parse_only=strainer)
+        listings = soup.find_all(tag, class_=class_name)
+        if listings:
+            return listings
+        soup = BeautifulSoup(html_content, "html.parser")
+        for tag, class_name in LISTING_SELECTORS[1:]:
+            listings = soup.find_all(tag, class_=class_name)
+            if listings:
+                return listings
+        return []
+
+    def fields(self, listing):
+        url_tag = None
+        for tag, class_name in LISTING_URL_SELECTORS:
+            url_tag = listing.find(tag, class_=class_name)
+            if url_tag:
+                break
         else:
-            print(f"Could not fetch search page {search_url}. Skipping.")
+            url_tag = listing.find("a", href=True)
+        fields = {"href": url_tag.get("href") if url_tag else None}
+        for field, selectors in LISTING_TEXT_SELECTORS.items():
+            fields[field] = None
+            for tag, class_name in selectors:
+                element = listing.find(tag, class_=class_name)
+                if element:
+                    fields[field] = element.get_text(strip=True)
+                    break
+        return fields
+
+
+class LxmlListingParser:
+    """lxml backend using XPath expressions compiled once."""
+
+    name = "lxml"
+
+    def __init__(self):
+        def has_class(class_name):
+            return (
+                f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+            )
+
+        self._listings = [
+            etree.XPath(f"//{tag}[{has_class(class_name)}]")
+            for tag, class_name in LISTING_SELECTORS
+        ]
+        self._url = [
+            etree.XPath(f"descendant::{tag}[{has_class(class_name)}][1]")
+            for tag, class_name in LISTING_URL_SELECTORS
+        ] + [etree.XPath("descendant::a[@href][1]")]
+        self._text_fields = {
+            field: [
+                etree.XPath(f"descendant::{tag}[{has_class(class_name)}][1]")
+                for tag, class_name in selectors
+            ]
+            for field, selectors in LISTING_TEXT_SELECTORS.items()
+        }
+        skip = " or ".join(f"ancestor::{tag}" for tag in NON_TEXT_TAGS)
+        self._text = etree.XPath(f"descendant::text()[not({skip})]")
+
+    def listings(self, html_content):
+        root = lxml.html.document_fromstring(html_content)
+        for xpath in self._listings:
+            listings = xpath(root)
+            if listings:
+                return listings
+        return []
+
+    def _first(self, listing, xpaths):
+        for xpath in xpaths:
+            found = xpath(listing)
+            if found:
+                return found[0]
+        return None
+
+    def fields(self, listing):
+        url_tag = self._first(listing, self._url)
+        fields = {"href": url_tag.get("href") if url_tag is not None else None}
+        for field, xpaths in self._text_fields.items():
+            element = self._first(listing, xpaths)
+            fields[field] = (
+                "".join(text.strip() for text in self._text(element))
+                if element is not None
+                else None
+            )
+        return fields
+
+
+class SelectolaxListingParser:
+    """selectolax (lexbor) backend using CSS selectors built once."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        self._listings = [
+            f"{tag}.{class_name}" for tag, class_name in LISTING_SELECTORS
+        ]
+        self._url = [
+            f"{tag}.{class_name}" for tag, class_name in LISTING_URL_SELECTORS
+        ] + ["a[href]"]
+        self._text_fields = {
+            field: [f"{tag}.{class_name}" for tag, class_name in selectors]
+            for field, selectors in LISTING_TEXT_SELECTORS.items()
+        }
+
+    def listings(self, html_content):
+        tree = LexborHTMLParser(html_content)
+        for selector in self._listings:
+            listings = tree.css(selector)
+            if listings:
+                return listings
+        return []
+
+    def _first(self, listing, selectors):
+        for selector in selectors:
+            found = listing.css_first(selector)
+            if found is not None:
+                return found
+        return None
+
+    def _text(self, element):
+        return "".join(
+            node.text_content.strip()
+            for node in element.traverse(include_text=True)
+            if node.tag == "-text" and node.parent.tag not in NON_TEXT_TAGS
+        )
+
+    def fields(self, listing):
+        url_tag = self._first(listing, self._url)
+        fields = {
+            "href": url_tag.attributes.get("href") if url_tag is not None else None
+        }
+        for field, selectors in self._text_fields.items():
+            element = self._first(listing, selectors)
+            fields[field] = self._text(element) if element is not None else None
+        return fields
+
+
+def available_search_parsers():
+    """Names of the search page parser backends installed, fastest first."""
+    names = []
+    if LexborHTMLParser is not None:
+        names.append("selectolax")
+    if etree is not None:
+        names.append("lxml")
+    names.append("bs4")
+    return names
+
+
+# What a parser backend raises on a page it cannot handle, so bs4 takes over
+SEARCH_PARSER_ERRORS = (ValueError, TypeError) + (
+    (etree.LxmlError,) if etree is not None else ()
+)
+
+
+_search_parsers = {}
+
+
+def get_search_parser(backend="auto"):
+    """Returns the (cached) parser for ``backend``; "auto" picks the fastest."""
+    if backend == "auto":
+        backend = available_search_parsers()[0]
+    if backend not in _search_parsers:
+        if backend not in available_search_parsers():
+            raise ValueError(f"Search parser backend not available: {backend}")
+        parser_class = {
+            "selectolax": SelectolaxListingParser,
+            "lxml": LxmlListingParser,
+            "bs4": Bs4ListingParser,
+        }[backend]
+        _search_parsers[backend] = parser_class()
+    return _search_parsers[backend]
+
+
+def has_search_listings(html_content, backend="auto"):
+    """Returns True if ``html_content`` is a search page with product listings."""
+    try:
+        return bool(get_search_parser(backend).listings(html_content))
+    except SEARCH_PARSER_ERRORS:
+        return bool(get_search_parser("bs4").listings(html_content))
+
+
+def parse_search_results(html_content, backend="auto"):
+    """
+    Parses one search results page into ``ProductRecord`` objects.
+    Returns None when the page has no product listings at all.
+
+    ``backend`` selects the HTML parser (see ``available_search_parsers``);
+    every backend produces the same records.
+    """
+    products_data = []
+    parser = get_search_parser(backend)
+    try:
+        product_listings = parser.listings(html_content)
+    except SEARCH_PARSER_ERRORS as e:
+        debug_print(f"{parser.name} could not parse the page ({e}), using bs4")
+        parser = get_search_parser("bs4")
+        product_listings = parser.listings(html_content)
+
+    if not product_listings:
+        print("No product listings found. Possible reasons:")
+        print("1. The page structure has changed")
+        print("2. The search returned no results")
+        print("3. The request was blocked")
+        print("\nHTML content preview:")
+        print(html_content[:500])  # Print first 500 chars for debugging
+        return None
+
+    for product in product_listings:
+        try:
+            fields = parser.fields(product)
+            url = fields["href"]
+
+            if not url:
+                print("Skipping product: No valid URL found")
+                continue
+
+            # Only process real product URLs
+            parsed_url = urlparse(url)
+            # Aceptamos solo dominios de MercadoLibre Argentina
+            if "mercadolibre.com.ar" not in parsed_url.netloc:
+                print(f"Skipping non-MercadoLibre URL: {url}")
+                continue
+
+            # Aceptamos productos si la URL contiene '/articulo/', '/MLA-' o '/p/MLA'
+            if not ("/articulo/" in url or "/MLA-" in url or "/p/MLA" in url):
+                print(f"Skipping non-product URL: {url}")
+                continue
+
+            product_data = ProductRecord(
+                canonical_product_url(url),
+                location=fields["location"],
+                product_reviews_summary=fields["reviews_summary"],
+            )
+
+            if fields["price_whole"] is not None:
+                price = fields["price_whole"]
+                if fields["price_cents"] is not None:
+                    price += "." + fields["price_cents"]
+                product_data.update({"price": price})
+
+            products_data.append(product_data)
+
+        except Exception as e:
+            print(f"Error processing product: {str(e)}")
+            continue
 
     return products_data
 
 
+# --- Embedded Data Extraction ---
+
+JSON_LD_RE = re.compile(
+    r"<script[^>]*type=[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL,
+)
+PRELOADED_STATE_RE = re.compile(
+    r"(?:__PRELOADED_STATE__\s*=\s*"
+    r"|<script[^>]*id=[\"']__PRELOADED_STATE__[\"'][^>]*>\s*)",
+    re.IGNORECASE,
+)
+
+
+def parse_sales_text(text):
+    """Returns the number of sales mentioned in ``text`` as a string, or None."""
+    if not text:
+        return None
+    for pattern in SALES_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            num = match.group(1)
+            # Convert "mil" to actual number
+            if "mil" in text.lower() or "miles" in text.lower():
+                try:
+                    num = str(int(float(num.replace(",", ".")) * 1000))
+                except ValueError:
+                    return None
+            # Dots separate thousands ("+1.000 vendidos")
+            return num.replace(".", "")
+    return None
+
+
+def _json_ld_items(html):
+    """Yields every JSON object found in the page's JSON-LD blocks."""
+    for match in JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(reversed(item))
+            elif isinstance(item, dict):
+                yield item
+                if isinstance(item.get("@graph"), list):
+                    stack.extend(reversed(item["@graph"]))
+
+
+def _preloaded_state(html):
+    """Decodes the preloaded app state object, or returns None."""
+    match = PRELOADED_STATE_RE.search(html)
+    if not match:
+        return None
+    try:
+        state, _ = json.JSONDecoder().raw_decode(html, match.end())
+    except ValueError:
+        return None
+    return state
+
+
+def _walk_json(node):
+    """Yields ``(key, value)`` for every object member in a JSON tree."""
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                yield key, value
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+# Components of the preloaded state that hold product fields, by component
+# ID; other components (shipping, seller, ...) reuse the same field names
+STATE_COMPONENTS = {
+    "header": "num_sales",
+    "breadcrumb": "category_path",
+    "description": "description",
+    "reviews": "review_snippets",
+    "reviews_capability_v3": "review_snippets",
+}
+
+
+def _state_components(state):
+    """
+    Yields ``(component_id, component)`` for the page components in the
+    preloaded state: the members of every ``components`` object, and the
+    items with an ``id`` of every ``components`` list inside it.
+    """
+    for key, value in _walk_json(state):
+        if key != "components" or not isinstance(value, dict):
+            continue
+        for name, component in value.items():
+            if isinstance(component, dict):
+                yield name, component
+            elif isinstance(component, list):
+                for item in component:
+                    if isinstance(item, dict) and isinstance(item.get("id"), str):
+                        yield item["id"], item
+
+
+def _json_text(value):
+    """Text of a JSON value that is either a string or ``{"text": ...}``."""
+    if isinstance(value, dict):
+        value = value.get("text") or value.get("content")
+    return value.strip() if isinstance(value, str) else None
+
+
+def _review_snippets(texts):
+    """Applies the page scraper's review rules: first 5, longer than 10 chars."""
+    return [text for text in texts[:5] if text and len(text) > 10]
+
+
+def extract_embedded_product_data(html):
+    """
+    Extracts product fields from the structured data embedded in a product
+    page: JSON-LD blocks first, then the ``STATE_COMPONENTS`` of the
+    preloaded app state.
+
+    Returns only the fields that were found (``title``, ``description``,
+    ``num_sales``, ``category_path``, ``review_snippets``); the caller falls
+    back to DOM selectors for the rest.
+    """
+    found = {}
+    for item in _json_ld_items(html):
+        types = item.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if "Product" in types:
+            if isinstance(item.get("name"), str) and item["name"].strip():
+                found.setdefault("title", item["name"].strip())
+            if isinstance(item.get("description"), str) and item["description"]:
+                found.setdefault("description", item["description"])
+            reviews = item.get("review")
+            if isinstance(reviews, dict):
+                reviews = [reviews]
+            if isinstance(reviews, list) and "review_snippets" not in found:
+                snippets = _review_snippets(
+                    [
+                        _json_text(review.get("reviewBody"))
+                        for review in reviews
+                        if isinstance(review, dict)
+                    ]
+                )
+                if snippets:
+                    found["review_snippets"] = snippets
+        elif "BreadcrumbList" in types and "category_path" not in found:
+            elements = [
+                element
+                for element in item.get("itemListElement") or []
+                if isinstance(element, dict)
+            ]
+            elements.sort(key=lambda element: element.get("position") or 0)
+            names = []
+            for element in elements:
+                name = element.get("name")
+                if not name and isinstance(element.get("item"), dict):
+                    name = element["item"].get("name")
+                if isinstance(name, str) and name.strip():
+                    names.append(name.strip())
+            if names:
+                found["category_path"] = " > ".join(names)
+
+    if len(found) == 5:
+        return found
+    state = _preloaded_state(html)
+    if state is None:
+        return found
+
+    for name, component in _state_components(state):
+        field = STATE_COMPONENTS.get(name)
+        if field is None or field in found:
+            continue
+        if field == "num_sales":
+            num = parse_sales_text(_json_text(component.get("subtitle")))
+            if num is not None:
+                found["num_sales"] = num
+        elif field == "category_path":
+            categories = component.get("categories")
+            names = [
+                _json_text(category.get("label") or category.get("name"))
+                for category in categories or []
+                if isinstance(category, dict)
+            ]
+            names = [name for name in names if name]
+            if names:
+                found["category_path"] = " > ".join(names)
+        elif field == "description":
+            text = _json_text(component)
+            if text:
+                found["description"] = text
+        elif field == "review_snippets":
+            reviews = component.get("reviews")
+            if isinstance(reviews, list):
+                snippets = _review_snippets(
+                    [
+                        _json_text(review.get("comment") or review.get("text"))
+                        for review in reviews
+                        if isinstance(review, dict)
+                    ]
+                )
+                if snippets:
+                    found["review_snippets"] = snippets
+    return found
+
+
 def setup_driver():
     """Set up and return a configured Chrome WebDriver."""
     chrome_options = Options()
@@ -239,152 +1553,436 @@ def setup_driver():
     return driver
 
 
-async def scrape_product_page(product_url):
+# --- Browser Pool ---
+
+
+class BrowserPool:
     """
-    Navigates into product detail pages and extracts description,
-    number of sales, review snippets, and category path using Playwright.
+    Long-lived pool of Playwright browsers for product detail scraping.
+
+    Launches ``num_browsers`` Chromium instances with ``contexts_per_browser``
+    contexts each, once per run. Every context owns a single page that is
+    leased out for one URL at a time and recycled afterwards, so the cost of
+    starting a browser is paid once instead of per product.
+
+    With ``fast=True`` every context routes requests through
+    ``route_fast_mode``. Bytes received by each page are tracked over CDP and
+    per-page timings are collected in ``page_stats``. Navigations are paced
+    by ``rate_limiter`` and rendered pages are kept in ``cache`` when given.
+    Rendered pages are also saved to ``recorder``; with ``replay_server`` set,
+    pages are loaded from it and every non-loopback request is blocked.
+
+    Used without ``async with``, the browsers are only launched when the
+    first page is leased; ``close()`` must still be called.
     """
-    product_details = {
-        "description": "N/A",
-        "num_sales": "N/A",
-        "review_snippets": [],
-        "category_path": "N/A",
-    }
 
-    print(f"Fetching product detail page: {product_url}")
+    def __init__(
+        self,
+        num_browsers=1,
+        contexts_per_browser=3,
+        headless=True,
+        fast=False,
+        rate_limiter=None,
+        cache=None,
+        recorder=None,
+        replay_server=None,
+    ):
+        self.num_browsers = max(1, num_browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.headless = headless
+        self.fast = fast
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.recorder = recorder
+        self.replay_server = replay_server
+        self.page_stats = []
+        self._playwright = None
+        self._browsers = []
+        self._pages = None
+        self._received = {}
+        self._relaunched = {}
+        self._start_lock = asyncio.Lock()
+        self._relaunch_lock = asyncio.Lock()
+
+    @property
+    def size(self):
+        """Total number of pages that can be leased concurrently."""
+        return self.num_browsers * self.contexts_per_browser
+
+    async def start(self):
+        """Launches the browsers and opens one page per context."""
+        self._playwright = await async_playwright().start()
+        self._pages = asyncio.Queue()
+        for _ in range(self.num_browsers):
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._browsers.append(browser)
+            for _ in range(self.contexts_per_browser):
+                self._pages.put_nowait(await self._open_context(browser))
+        debug_print(
+            f"Browser pool started: {self.num_browsers} browser(s) x "
+            f"{self.contexts_per_browser} context(s), fast mode: {self.fast}"
+        )
+        return self
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+    async def _open_context(self, browser):
+        """Opens a new context in ``browser`` and returns its page."""
         context = await browser.new_context(
             user_agent=HEADERS[0]["User-Agent"],
             viewport={"width": 1920, "height": 1080},
         )
+        if self.replay_server:
+            await context.route("**/*", route_offline)
+        elif self.fast:
+            await context.route("**/*", route_fast_mode)
+        return await self._new_page(context)
 
-        try:
-            page = await context.new_page()
-            await page.goto(product_url, wait_until="networkidle")
+    async def _new_page(self, context):
+        """Opens a page and starts counting the bytes it receives."""
+        page = await context.new_page()
+        received = [0]
+        self._received[page] = received
 
-            # Wait and get actual product title
-            try:
-                await page.wait_for_selector("h1.ui-pdp-title", timeout=15000)
-                title_element = await page.query_selector("h1.ui-pdp-title")
-                if title_element:
-                    title = await title_element.text_content()
-                    if title and title.strip():
-                        product_details["title"] = title.strip()
-            except Exception as e:
-                print(f"Error extracting title: {str(e)}")
-
-            # Add a small delay to ensure dynamic content loads
-            await page.wait_for_timeout(1500)
-
-            # Scroll to load dynamic content
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await page.wait_for_timeout(1000)
-            await page.evaluate("window.scrollTo(0, 0)")
-
-            # Description
-            description_selectors = [
-                "div.item-description__text",
-                "p.ui-pdp-description__content",
-                "div.ui-pdp-description__content",
-                "div.ui-pdp-description__content__container",
-                "div.ui-pdp-description__content__container__text",
-            ]
+        def on_loading_finished(event):
+            received[0] += event.get("encodedDataLength", 0)
 
-            for selector in description_selectors:
-                try:
-                    element = await page.query_selector(selector)
-                    if element:
-                        product_details["description"] = await element.text_content()
-                        break
-                except Exception:
-                    continue
+        try:
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            cdp.on("Network.loadingFinished", on_loading_finished)
+        except PlaywrightError as e:
+            debug_print(f"Transfer accounting unavailable: {e}")
+        return page
+
+    def bytes_received(self, page):
+        """Bytes received by ``page`` since it was last leased."""
+        return self._received.get(page, [0])[0]
+
+    def record_page(self, url, page, seconds):
+        """Stores transfer size and time-to-extract for one product page."""
+        stats = {"url": url, "bytes": self.bytes_received(page), "seconds": seconds}
+        self.page_stats.append(stats)
+        debug_print(
+            f"Page stats: {stats['bytes'] / 1024:.1f} KiB in {seconds:.2f} s - {url}"
+        )
+        return stats
+
+    def print_page_stats(self):
+        """Prints averages over every page scraped through the pool."""
+        if not self.page_stats:
+            return
+        count = len(self.page_stats)
+        total_bytes = sum(stats["bytes"] for stats in self.page_stats)
+        total_seconds = sum(stats["seconds"] for stats in self.page_stats)
+        print(
+            f"Product pages: {count}, avg transfer {total_bytes / count / 1024:.1f} KiB, "
+            f"avg time-to-extract {total_seconds / count:.2f} s"
+        )
 
-            # Number of sales - Improved extraction with multiple patterns
+    async def close(self):
+        """Closes every browser and stops Playwright."""
+        for browser in self._browsers:
             try:
-                sales_selectors = [
-                    "span.ui-pdp-subtitle",
-                    "p.ui-pdp-subtitle",
-                    "span.ui-pdp-header__subtitle",
-                    "div.ui-pdp-header__info",
-                    "div.ui-pdp-seller__sales-info",
-                    "span.ui-pdp-seller__sales-info__text",
-                ]
-
-                for selector in sales_selectors:
-                    try:
-                        element = await page.query_selector(selector)
-                        if element:
-                            text = await element.text_content()
-                            # Match various sales number formats
-                            patterns = [
-                                r"\+?(\d+)\s+(?:vendidos|ventas|unidades vendidas|unidades|compras|compradores)",
-                                r"\+?(\d+(?:[.,]\d+)?)\s*(?:mil|miles)\s+(?:vendidos|ventas)",
-                                r"más de\s+(\d+(?:[.,]\d+)?)\s+(?:vendidos|ventas)",
-                            ]
-
-                            for pattern in patterns:
-                                match = re.search(pattern, text, re.IGNORECASE)
-                                if match:
-                                    num = match.group(1)
-                                    # Convert "mil" to actual number
-                                    if "mil" in text.lower() or "miles" in text.lower():
-                                        num = str(int(float(num) * 1000))
-                                    product_details["num_sales"] = num
-                                    break
-                            if product_details["num_sales"] != "N/A":
-                                break
-                    except Exception:
-                        continue
-            except Exception as e:
-                print(f"Error getting sales info: {str(e)}")
-
-            # Review snippets - Improved extraction with multiple selectors
+                await browser.close()
+            except PlaywrightError as e:
+                print(f"Error closing browser: {e}")
+        self._browsers = []
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Leases a page for one URL and returns it to the pool afterwards.
+        Browsers are launched on the first lease if the pool was not started.
+        """
+        async with self._start_lock:
+            if self._pages is None:
+                await self.start()
+        page = await self._pages.get()
+        if page is None:
+            # The slot lost its page to a crash; open a new one or give the
+            # slot back so the next lease tries again
             try:
-                review_selectors = [
-                    "p.ui-review-capability-comments__comment__content",
-                    "div.ui-review-capability__comment__content",
-                    "p.ui-review-capability__comment__content",
-                ]
-
-                for selector in review_selectors:
-                    review_elements = await page.query_selector_all(selector)
-                    if review_elements:
-                        for review in review_elements[:5]:  # Get top 5 reviews
-                            review_text = await review.text_content()
-                            if review_text and len(review_text.strip()) > 10:
-                                product_details["review_snippets"].append(
-                                    review_text.strip()
-                                )
-                        if product_details["review_snippets"]:
-                            break
-            except Exception as e:
-                print(f"Error getting reviews: {str(e)}")
-
-            # Category path
+                page = await self._replace_page()
+            except Exception:
+                self._pages.put_nowait(None)
+                raise
+        self._received.get(page, [0])[0] = 0
+        try:
+            yield page
+        finally:
+            replacement = None
+            try:
+                replacement = await self._recycle(page)
+            except PlaywrightError as e:
+                print(f"Error replacing browser page: {e}")
+            finally:
+                self._pages.put_nowait(replacement)
+
+    async def _recycle(self, page):
+        """Resets a page for reuse, replacing it if it crashed or was closed."""
+        if not page.is_closed():
             try:
-                category_elements = await page.query_selector_all(
-                    "a.andes-breadcrumb__link"
+                await page.goto("about:blank")
+                return page
+            except PlaywrightError as e:
+                debug_print(f"Replacing page that failed to reset: {e}")
+                with suppress(PlaywrightError):
+                    await page.close()
+        self._received.pop(page, None)
+        try:
+            return await self._new_page(page.context)
+        except PlaywrightError as e:
+            debug_print(f"Replacing context that failed to open a page: {e}")
+        return await self._replace_page(page.context.browser)
+
+    async def _replace_page(self, browser=None):
+        """
+        Opens a page in a new context, relaunching ``browser`` first when it
+        is gone. Without a ``browser``, the browser of the pool with the
+        fewest open contexts is used, so refilled slots stay spread out.
+        """
+        async with self._relaunch_lock:
+            while browser in self._relaunched:
+                browser = self._relaunched[browser]
+            if browser is None:
+                browser = min(self._browsers, key=lambda b: len(b.contexts))
+            if not browser.is_connected():
+                debug_print("Relaunching a browser that disconnected")
+                replacement = await self._playwright.chromium.launch(
+                    headless=self.headless
+                )
+                if browser in self._browsers:
+                    self._browsers[self._browsers.index(browser)] = replacement
+                self._relaunched[browser] = replacement
+                browser = replacement
+        return await self._open_context(browser)
+
+
+async def navigate(page, url, pool, retries=3):
+    """
+    Loads ``url`` in a pooled page within the pool's rate limit, retrying
+    when the server answers 429/503.
+    """
+    limiter = pool.rate_limiter
+    for attempt in range(retries):
+        if limiter:
+            await limiter.wait(url)
+        response = await page.goto(
+            url, wait_until="domcontentloaded" if pool.fast else "networkidle"
+        )
+        if not (response and limiter and attempt < retries - 1):
+            return response
+        retry_after = await response.header_value("retry-after")
+        if not limiter.throttle(url, response.status, retry_after):
+            return response
+
+
+async def wait_until_ready(page, url, pool):
+    """
+    Waits for a freshly navigated product page to render its content.
+
+    In a fast pool the page counts as ready once the title and description
+    selectors resolve; otherwise fixed delays let dynamic content settle.
+    """
+    try:
+        await page.wait_for_selector(TITLE_SELECTOR, timeout=15000)
+    except PlaywrightError as e:
+        print(f"Error extracting title: {str(e)}")
+
+    if pool.fast:
+        # Reviews are lazy-loaded, so scroll and give them a short bounded wait
+        try:
+            await page.wait_for_selector(", ".join(DESCRIPTION_SELECTORS), timeout=5000)
+        except PlaywrightError:
+            debug_print(f"No description selector resolved on {url}")
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        with suppress(PlaywrightError):
+            await page.wait_for_selector(", ".join(REVIEW_SELECTORS), timeout=2000)
+        await page.evaluate("window.scrollTo(0, 0)")
+    else:
+        # Add a small delay to ensure dynamic content loads
+        await page.wait_for_timeout(1500)
+
+        # Scroll to load dynamic content
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        await page.wait_for_timeout(1000)
+        await page.evaluate("window.scrollTo(0, 0)")
+
+
+async def load_cached_page(page, html):
+    """Loads previously rendered HTML into ``page`` without touching the network."""
+
+    async def block(route):
+        await route.abort()
+
+    await page.route("**/*", block)
+    try:
+        await page.set_content(html, wait_until="domcontentloaded")
+    finally:
+        await page.unroute("**/*", block)
+
+
+EXTRACT_PRODUCT_JS = """
+(selectors) => {
+    const text = (element) => (element ? element.textContent : null);
+    const fields = {};
+
+    const title = text(document.querySelector(selectors.title));
+    if (title && title.trim()) fields.title = title.trim();
+
+    for (const selector of selectors.description) {
+        const element = document.querySelector(selector);
+        if (element) {
+            fields.description = text(element);
+            break;
+        }
+    }
+
+    fields.sales_texts = selectors.sales.map(
+        (selector) => text(document.querySelector(selector))
+    );
+
+    for (const selector of selectors.reviews) {
+        const elements = [...document.querySelectorAll(selector)].slice(0, 5);
+        const reviews = elements
+            .map((element) => text(element).trim())
+            .filter((review) => review.length > 10);
+        if (reviews.length) {
+            fields.review_snippets = reviews;
+            break;
+        }
+    }
+
+    const crumbs = [...document.querySelectorAll(selectors.breadcrumb)];
+    if (crumbs.length) fields.category_path = crumbs.map(text).join(" > ");
+
+    return fields;
+}
+"""
+
+
+async def extract_rendered_fields(page):
+    """
+    Extracts the selector-based product fields from the rendered DOM in a
+    single ``page.evaluate`` call, rather than one browser round trip per
+    selector and element.
+
+    Returns only the fields that were found; sales texts are matched against
+    ``SALES_PATTERNS`` here, in the order of ``SALES_SELECTORS``.
+    """
+    try:
+        fields = await page.evaluate(
+            EXTRACT_PRODUCT_JS,
+            {
+                "title": TITLE_SELECTOR,
+                "description": DESCRIPTION_SELECTORS,
+                "sales": SALES_SELECTORS,
+                "reviews": REVIEW_SELECTORS,
+                "breadcrumb": BREADCRUMB_SELECTOR,
+            },
+        )
+    except PlaywrightError as e:
+        print(f"Error extracting product fields: {e}")
+        return {}
+
+    for text in fields.pop("sales_texts", []):
+        num = parse_sales_text(text)
+        if num is not None:
+            fields["num_sales"] = num
+            break
+    return fields
+
+
+async def scrape_product_page(product_url, pool=None):
+    """
+    Navigates into product detail pages and extracts description,
+    number of sales, review snippets, and category path using Playwright.
+
+    Pages are leased from ``pool``; when no pool is given a single-browser
+    pool is started just for this URL. Pages rendered earlier are served
+    from the pool's cache (or its replay server) instead of being navigated
+    again.
+    """
+    if pool is None:
+        async with BrowserPool(num_browsers=1, contexts_per_browser=1) as own_pool:
+            return await scrape_product_page(product_url, own_pool)
+
+    product_details = {
+        "description": "N/A",
+        "num_sales": "N/A",
+        "review_snippets": [],
+        "category_path": "N/A",
+    }
+
+    print(f"Fetching product detail page: {product_url}")
+
+    async with pool.lease() as page:
+        started = time.perf_counter()
+        try:
+            cached_html = None
+            if pool.replay_server:
+                await page.goto(
+                    pool.replay_server.url_for(product_url),
+                    wait_until="domcontentloaded",
+                )
+            else:
+                if pool.cache:
+                    cached_html = pool.cache.get(product_url, "rendered")
+                if cached_html is not None:
+                    debug_print(f"Cache hit: {product_url}")
+                    await load_cached_page(page, cached_html)
+                else:
+                    await navigate(page, product_url, pool)
+                    await wait_until_ready(page, product_url, pool)
+
+            # Structured data embedded in the page covers most fields at once
+            html = cached_html or await page.content()
+            product_details.update(extract_embedded_product_data(html))
+
+            # Selector fallbacks for whatever the embedded data lacked, all
+            # evaluated in the page in a single round trip
+            missing = [
+                field
+                for field in (
+                    "description",
+                    "num_sales",
+                    "review_snippets",
+                    "category_path",
                 )
-                if category_elements:
-                    category_path = []
-                    for element in category_elements:
-                        category_path.append(await element.text_content())
-                    product_details["category_path"] = " > ".join(category_path)
-            except Exception as e:
-                print(f"Error getting category path: {str(e)}")
+                if product_details[field] in ("N/A", [])
+            ]
+            if missing or "title" not in product_details:
+                rendered = await extract_rendered_fields(page)
+                for field, value in rendered.items():
+                    if field == "title":
+                        product_details.setdefault("title", value)
+                    elif field in missing:
+                        product_details[field] = value
 
             # Debug information
             if DEBUG:
                 print(f"Found {len(product_details['review_snippets'])} reviews")
                 print(f"Sales: {product_details['num_sales']}")
 
+            if not pool.replay_server and (pool.cache or pool.recorder):
+                # Only cache pages that rendered a product, not block/error pages
+                if pool.cache and cached_html is None and "title" in product_details:
+                    pool.cache.set(product_url, html, "rendered")
+                if pool.recorder:
+                    pool.recorder.set(product_url, html, "rendered")
+
         except Exception as e:
             print(f"Error scraping product page: {str(e)}")
 
-        finally:
-            await browser.close()
+        pool.record_page(product_url, page, time.perf_counter() - started)
 
     return product_details
 
@@ -394,52 +1992,244 @@ def scrape_product_page_sync(product_url):
     return asyncio.run(scrape_product_page(product_url))
 
 
-def analyze_context_sentiment(text, positive_words, negative_words):
-    """Helper function to analyze sentiment for a specific context without recursion."""
-    if not text:
-        return {"sentiment": "neutral", "polarity": 0.0, "confidence": 0.0}
+# --- Tiered Product Fetching ---
 
-    text_lower = text.lower()
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+# Fields a static product page must yield to skip the browser
+PRODUCT_REQUIRED_FIELDS = ("title", "description", "category_path")
+# Markers of captcha and account-verification pages served instead of items
+BLOCK_MARKERS = ("account-verification", "g-recaptcha", "captcha-container")
 
-    total_words = positive_count + negative_count
-    if total_words == 0:
-        polarity = 0.0
-    else:
-        polarity = (positive_count - negative_count) / total_words
 
-    if polarity > 0.2:
-        sentiment = "positive"
-    elif polarity < -0.2:
-        sentiment = "negative"
-    else:
-        sentiment = "neutral"
+def looks_blocked(html):
+    """Returns True if ``html`` looks like a block page rather than an item."""
+    lowered = html.lower()
+    return any(marker in lowered for marker in BLOCK_MARKERS)
 
-    confidence = min(1.0, (positive_count + negative_count) / 10)
 
-    return {"sentiment": sentiment, "polarity": polarity, "confidence": confidence}
+def not_blocked(html):
+    """Returns True if ``html`` is not a block page; ``fetch_page``'s cache rule."""
+    return not looks_blocked(html)
 
 
-def analyze_sentiment(text):
-    """Performs detailed sentiment analysis on text with Spanish language support."""
-    if not text or text == "N/A":
-        return {
-            "sentiment": "neutral",
-            "polarity": 0.0,
-            "subjectivity": 0.0,
-            "confidence": 0.0,
-            "key_phrases": [],
-            "emotions": {},
-            "dominant_emotion": "neutral",
-            "emotional_intensity": 0.0,
-            "context_sentiment": {},
-            "sentiment_trend": "neutral",
-            "contextual_phrases": [],
-        }
+def extract_static_fields(html):
+    """
+    Static-HTML counterpart of ``extract_rendered_fields``: runs the same
+    selector chains over server-rendered markup with BeautifulSoup.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    fields = {}
+
+    element = soup.select_one(TITLE_SELECTOR)
+    title = element.get_text().strip() if element else ""
+    if title:
+        fields["title"] = title
+
+    for selector in DESCRIPTION_SELECTORS:
+        element = soup.select_one(selector)
+        if element:
+            fields["description"] = element.get_text()
+            break
+
+    for selector in SALES_SELECTORS:
+        element = soup.select_one(selector)
+        num = parse_sales_text(element.get_text()) if element else None
+        if num is not None:
+            fields["num_sales"] = num
+            break
+
+    for selector in REVIEW_SELECTORS:
+        reviews = _review_snippets(
+            [element.get_text().strip() for element in soup.select(selector)]
+        )
+        if reviews:
+            fields["review_snippets"] = reviews
+            break
+
+    crumbs = soup.select(BREADCRUMB_SELECTOR)
+    if crumbs:
+        fields["category_path"] = " > ".join(crumb.get_text() for crumb in crumbs)
+    return fields
+
+
+def parse_product_html(html):
+    """
+    Extracts product details from a product page's static HTML, using the
+    embedded data first and the selector chains for anything missing.
+    """
+    product_details = {
+        "description": "N/A",
+        "num_sales": "N/A",
+        "review_snippets": [],
+        "category_path": "N/A",
+    }
+    product_details.update(extract_embedded_product_data(html))
+    for field, value in extract_static_fields(html).items():
+        if field == "title":
+            product_details.setdefault("title", value)
+        elif product_details[field] in ("N/A", []):
+            product_details[field] = value
+    return product_details
+
+
+class TieredFetcher:
+    """
+    Fetches product details over plain HTTP first and escalates to the
+    browser pool only when the static page looks blocked or lacks any of
+    ``required`` fields.
+
+    ``tiers`` counts how many products each tier served.
+    """
+
+    def __init__(self, client, pool, required=PRODUCT_REQUIRED_FIELDS):
+        self.client = client
+        self.pool = pool
+        self.required = required
+        self.tiers = Counter()
+
+    async def scrape(self, product_url):
+        """Returns the product details for ``product_url``."""
+        html = await fetch_page(product_url, self.client)
+        if html and not looks_blocked(html):
+            product_details = parse_product_html(html)
+            missing = [
+                field
+                for field in self.required
+                if product_details.get(field) in (None, "N/A", [])
+            ]
+            if not missing:
+                self.tiers["http"] += 1
+                return product_details
+            debug_print(f"Static page lacks {', '.join(missing)}: {product_url}")
+        elif html:
+            debug_print(f"Static page looks blocked: {product_url}")
+
+        self.tiers["browser"] += 1
+        return await scrape_product_page(product_url, self.pool)
+
+    def print_stats(self):
+        """Prints how many products each tier served."""
+        total = sum(self.tiers.values())
+        if total:
+            print(
+                f"Product pages served over HTTP: {self.tiers['http']}/{total}, "
+                f"by the browser: {self.tiers['browser']}/{total}"
+            )
+
+
+# Failures that mark one product page as failed instead of stopping the run
+SCRAPE_ERRORS = (aiohttp.ClientError, TimeoutError, PlaywrightError, ValueError)
+
 
-    # Spanish sentiment indicators
-    positive_words = {
+async def scrape_product_pages(
+    products_data,
+    pool,
+    concurrency=3,
+    fetcher=None,
+    sink=None,
+    checkpoint=None,
+    known=None,
+):
+    """
+    Enriches products from their detail pages, ``concurrency`` at a time, reusing
+    those done in ``checkpoint`` or ``known``. With a ``sink`` they are written in
+    order and None is returned; otherwise they are returned in order.
+    """
+    total = len(products_data)
+    results = [None] * total
+    # How each product was completed: "ok" or "failed" when scraped here,
+    # "known" or "checkpoint" when it is read back from disk
+    done = [None] * total
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    written = 0
+    # Products done but waiting for an earlier one are bounded by this
+    reorder_limit = concurrency * 2
+    progress = asyncio.Event()
+
+    def load(index):
+        url = products_data[index].url
+        if done[index] == "known":
+            return read_product(known[item_key(url)])
+        if done[index] == "checkpoint":
+            return ProductRecord.from_dict(checkpoint.product(url)["product"])
+        return results[index]
+
+    def write_completed():
+        nonlocal written
+        while written < total and done[written] is not None:
+            product = load(written)
+            location = sink.write(product)
+            if known is not None and done[written] != "failed":
+                known.setdefault(item_key(product.url), location)
+            results[written] = None
+            written += 1
+        progress.set()
+
+    pending = []
+    reused = 0
+    for index, product in enumerate(products_data):
+        if known and item_key(product.url) in known:
+            done[index] = "known"
+            reused += 1
+        elif checkpoint and checkpoint.product_status(product.url) == "ok":
+            done[index] = "checkpoint"
+        else:
+            pending.append((index, product))
+    if reused:
+        print(f"Reusing {reused} product(s) already scraped for another keyword")
+    if checkpoint and len(pending) < total - reused:
+        print(
+            f"Skipping {total - reused - len(pending)} product(s) done in the checkpoint"
+        )
+    if sink:
+        write_completed()
+
+    async def producer():
+        for item in pending:
+            while sink and item[0] - written >= reorder_limit:
+                progress.clear()
+                await progress.wait()
+            await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, product = item
+            print(f"Processing product {index + 1}/{total}: {product.url}")
+            # Enrich a copy, so the search result stays small
+            enriched = copy.copy(product)
+            try:
+                if fetcher:
+                    details = await fetcher.scrape(product.url)
+                else:
+                    details = await scrape_product_page(product.url, pool)
+                enriched.update(details)
+                # Pages that never showed a product title count as failed
+                status = "ok" if "title" in details else "failed"
+            except SCRAPE_ERRORS as e:
+                print(f"Error processing {product.url}: {e}")
+                status = "failed"  # Keep the search result data
+            results[index] = enriched
+            done[index] = status
+            if checkpoint:
+                checkpoint.record_product(product.url, status, enriched.to_dict())
+            if sink:
+                write_completed()
+
+    await asyncio.gather(producer(), *(worker() for _ in range(concurrency)))
+    if sink:
+        return None
+    return [load(index) for index in range(total)]
+
+
+# --- Sentiment Lexicons ---
+
+# Spanish sentiment indicators
+POSITIVE_WORDS = frozenset(
+    {
         "excelente",
         "bueno",
         "genial",
@@ -466,8 +2256,10 @@ def analyze_sentiment(text):
         "eficiente",
         "calidad",
     }
+)
 
-    negative_words = {
+NEGATIVE_WORDS = frozenset(
+    {
         "malo",
         "mal",
         "pésimo",
@@ -491,22 +2283,247 @@ def analyze_sentiment(text):
         "insatisfecho",
         "insatisfecha",
     }
+)
+
+SENTIMENT_WORDS = POSITIVE_WORDS | NEGATIVE_WORDS
+
+EMOTIONS = {
+    "joy": {
+        "words": [
+            "feliz",
+            "contento",
+            "alegre",
+            "satisfecho",
+            "encantado",
+            "genial",
+            "excelente",
+        ],
+        "intensity": 1.0,
+    },
+    "trust": {
+        "words": [
+            "confiable",
+            "seguro",
+            "recomendado",
+            "garantizado",
+            "original",
+            "auténtico",
+        ],
+        "intensity": 0.9,
+    },
+    "fear": {
+        "words": [
+            "preocupado",
+            "inseguro",
+            "dudoso",
+            "temeroso",
+            "problema",
+            "falla",
+        ],
+        "intensity": -0.8,
+    },
+    "surprise": {
+        "words": [
+            "sorpresa",
+            "increíble",
+            "asombroso",
+            "impresionante",
+            "maravilloso",
+        ],
+        "intensity": 0.7,
+    },
+    "sadness": {
+        "words": ["decepcionado", "triste", "insatisfecho", "molesto", "terrible"],
+        "intensity": -0.6,
+    },
+    "disgust": {
+        "words": ["terrible", "horrible", "pésimo", "deplorable", "no funciona"],
+        "intensity": -0.9,
+    },
+    "anger": {
+        "words": ["enojado", "frustrado", "irritado", "molesto", "defectuoso"],
+        "intensity": -0.7,
+    },
+    "anticipation": {
+        "words": ["esperanzado", "optimista", "confiado", "positivo", "recomiendo"],
+        "intensity": 0.8,
+    },
+}
+
+# Context-specific sentiment analysis
+SENTIMENT_CONTEXTS = {
+    "product_quality": {
+        "keywords": ["calidad", "durabilidad", "material", "resistente"],
+        "weight": 1.2,
+    },
+    "price_value": {
+        "keywords": ["precio", "valor", "económico", "caro", "barato"],
+        "weight": 1.0,
+    },
+    "usability": {
+        "keywords": ["fácil", "sencillo", "intuitivo", "complicado"],
+        "weight": 1.1,
+    },
+    "customer_service": {
+        "keywords": ["atención", "soporte", "ayuda", "servicio"],
+        "weight": 0.9,
+    },
+}
 
-    # Convert to lowercase for comparison
-    text_lower = text.lower()
+# Sentiment trend detection
+TREND_INDICATORS = {
+    "improving": ["mejoró", "superó", "avanzó", "evolucionó", "progresó"],
+    "declining": ["empeoró", "degradó", "retrocedió", "falló", "decepcionó"],
+    "stable": ["mantiene", "consistente", "estable", "igual", "similar"],
+}
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lowercases ``text`` and splits it into word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class LexiconMatcher:
+    """
+    Matches the terms of several lexicons against a text in one pass.
+
+    ``lexicons`` maps a label to its terms. The text is split once into its
+    vocabulary of distinct words, which is intersected with a single table
+    of every single-word term; phrases ("no funciona") are only searched for
+    when all of their words occur. Terms match whole words only, and
+    overlapping terms ("muy bueno" and "bueno") are all found.
+    """
+
+    def __init__(self, lexicons):
+        self.labels = list(lexicons)
+        # Normalized terms per label, and every distinct term in a fixed order
+        self.lexicons = {
+            label: [" ".join(tokenize(term)) for term in terms]
+            for label, terms in lexicons.items()
+        }
+        self.terms = list(dict.fromkeys(t for ts in self.lexicons.values() for t in ts))
+        self._words = {}
+        self._phrases = {}
+        for label, terms in lexicons.items():
+            for term in terms:
+                words = tokenize(term)
+                if len(words) == 1:
+                    self._words.setdefault(words[0], []).append(label)
+                else:
+                    phrase = " ".join(words)
+                    if phrase not in self._phrases:
+                        pattern = r"\s+".join(map(re.escape, words))
+                        self._phrases[phrase] = (
+                            words,
+                            re.compile(rf"(?<!\w){pattern}(?!\w)"),
+                            [],
+                        )
+                    self._phrases[phrase][2].append(label)
+
+    def vocabulary(self, text):
+        """Returns the set of distinct word tokens in lowercased ``text``."""
+        vocabulary = set()
+        for chunk in set(text.split()):
+            vocabulary.update(TOKEN_RE.findall(chunk))
+        return vocabulary
+
+    def find(self, text):
+        """Returns the set of terms, of any lexicon, found in lowercased ``text``."""
+        vocabulary = self.vocabulary(text)
+        found = self._words.keys() & vocabulary
+        for phrase, (words, pattern, _) in self._phrases.items():
+            if vocabulary.issuperset(words) and pattern.search(text):
+                found.add(phrase)
+        return found
+
+    def find_all(self, texts, split=None):
+        """
+        Runs ``find()`` on every lowercased text in ``texts`` at once and
+        returns ``(rows, columns)`` arrays, one pair per text index and
+        ``self.terms`` index found. ``split`` is ``text.split()`` of each text,
+        when already at hand. Each distinct word of the batch is tokenized
+        and looked up once.
+        """
+        if split is None:
+            split = [text.split() for text in texts]
+        counts = np.fromiter(map(len, split), dtype=np.int64, count=len(split))
+        chunks = list(chain.from_iterable(split))
+        distinct = list(dict.fromkeys(chunks))
+        ids = dict(zip(distinct, range(len(distinct))))
+        # The text and distinct word of every word in the batch
+        pair_rows = np.repeat(np.arange(len(split)), counts)
+        pair_chunks = np.fromiter(map(ids.__getitem__, chunks), np.int64, len(chunks))
+
+        column = {term: i for i, term in enumerate(self.terms)}
+        phrase_words = {
+            word for words, _, _ in self._phrases.values() for word in words
+        }
+        chunk_columns = []
+        chunks_with = {word: [] for word in phrase_words}
+        for chunk_id, chunk in enumerate(distinct):
+            tokens = set(TOKEN_RE.findall(chunk))
+            chunk_columns.append([column[t] for t in self._words.keys() & tokens])
+            for word in tokens & phrase_words:
+                chunks_with[word].append(chunk_id)
+
+        # Single-word terms: expand each pair into the terms of its chunk
+        sizes = np.fromiter(map(len, chunk_columns), np.int64, len(chunk_columns))
+        flat = np.fromiter(chain.from_iterable(chunk_columns), np.int64)
+        starts = np.cumsum(sizes) - sizes
+        n = sizes[pair_chunks]
+        within = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        rows = [np.repeat(pair_rows, n)]
+        columns = [flat[np.repeat(starts[pair_chunks], n) + within]]
+
+        # Phrases are searched for only in texts that have all their words
+        for phrase, (words, pattern, _) in self._phrases.items():
+            candidates = None
+            for word in words:
+                with_word = set(
+                    pair_rows[np.isin(pair_chunks, chunks_with[word])].tolist()
+                )
+                candidates = with_word if candidates is None else candidates & with_word
+                if not candidates:
+                    break
+            found = [row for row in sorted(candidates) if pattern.search(texts[row])]
+            rows.append(np.array(found, dtype=np.int64))
+            columns.append(np.full(len(found), column[phrase], dtype=np.int64))
+        return np.concatenate(rows), np.concatenate(columns)
+
+    def match(self, text):
+        """Returns ``{label: set of terms found}`` for lowercased ``text``."""
+        hits = {label: set() for label in self.labels}
+        for term in self.find(text):
+            entry = self._words.get(term) or self._phrases[term][2]
+            for label in entry:
+                hits[label].add(term)
+        return hits
+
+
+SENTIMENT_MATCHER = LexiconMatcher(
+    {
+        ("sentiment", "positive"): POSITIVE_WORDS,
+        ("sentiment", "negative"): NEGATIVE_WORDS,
+        **{("emotion", name): data["words"] for name, data in EMOTIONS.items()},
+        **{
+            ("context", name): data["keywords"]
+            for name, data in SENTIMENT_CONTEXTS.items()
+        },
+        **{("trend", name): words for name, words in TREND_INDICATORS.items()},
+    }
+)
 
-    # Count positive and negative words
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
 
-    # Calculate polarity (-1 to 1)
+def score_polarity(positive_count, negative_count):
+    """Turns positive/negative indicator counts into sentiment, polarity and confidence."""
     total_words = positive_count + negative_count
     if total_words == 0:
         polarity = 0.0
     else:
         polarity = (positive_count - negative_count) / total_words
 
-    # Determine sentiment
     if polarity > 0.2:
         sentiment = "positive"
     elif polarity < -0.2:
@@ -514,205 +2531,576 @@ def analyze_sentiment(text):
     else:
         sentiment = "neutral"
 
-    # Calculate subjectivity (0 to 1)
-    emotional_words = positive_words.union(negative_words)
-    emotional_count = sum(1 for word in emotional_words if word in text_lower)
-    total_words_in_text = len(text_lower.split())
-    subjectivity = (
-        emotional_count / total_words_in_text if total_words_in_text > 0 else 0.0
-    )
+    confidence = min(1.0, (positive_count + negative_count) / 10)
 
-    # Enhanced emotion detection
-    emotions = {
-        "joy": {
-            "words": [
-                "feliz",
-                "contento",
-                "alegre",
-                "satisfecho",
-                "encantado",
-                "genial",
-                "excelente",
-            ],
-            "intensity": 1.0,
-        },
-        "trust": {
-            "words": [
-                "confiable",
-                "seguro",
-                "recomendado",
-                "garantizado",
-                "original",
-                "auténtico",
-            ],
-            "intensity": 0.9,
-        },
-        "fear": {
-            "words": [
-                "preocupado",
-                "inseguro",
-                "dudoso",
-                "temeroso",
-                "problema",
-                "falla",
-            ],
-            "intensity": -0.8,
-        },
-        "surprise": {
-            "words": [
-                "sorpresa",
-                "increíble",
-                "asombroso",
-                "impresionante",
-                "maravilloso",
-            ],
-            "intensity": 0.7,
-        },
-        "sadness": {
-            "words": ["decepcionado", "triste", "insatisfecho", "molesto", "terrible"],
-            "intensity": -0.6,
-        },
-        "disgust": {
-            "words": ["terrible", "horrible", "pésimo", "deplorable", "no funciona"],
-            "intensity": -0.9,
-        },
-        "anger": {
-            "words": ["enojado", "frustrado", "irritado", "molesto", "defectuoso"],
-            "intensity": -0.7,
-        },
-        "anticipation": {
-            "words": ["esperanzado", "optimista", "confiado", "positivo", "recomiendo"],
-            "intensity": 0.8,
-        },
+    return {"sentiment": sentiment, "polarity": polarity, "confidence": confidence}
+
+
+def _empty_sentiment():
+    """Sentiment result for empty text."""
+    return {
+        "sentiment": "neutral",
+        "polarity": 0.0,
+        "subjectivity": 0.0,
+        "confidence": 0.0,
+        "key_phrases": [],
+        "emotions": {},
+        "dominant_emotion": "neutral",
+        "emotional_intensity": 0.0,
+        "context_sentiment": {},
+        "sentiment_trend": "neutral",
+        "contextual_phrases": [],
     }
 
-    # Calculate emotion scores with intensity
-    emotion_scores = {emotion: 0.0 for emotion in emotions}
-    for emotion, data in emotions.items():
-        for word in data["words"]:
-            if word in text_lower:
-                emotion_scores[emotion] += data["intensity"]
-
-    # Normalize emotion scores
-    total_emotions = sum(abs(score) for score in emotion_scores.values())
-    if total_emotions > 0:
-        emotion_scores = {k: v / total_emotions for k, v in emotion_scores.items()}
-
-    # Get dominant emotion
-    dominant_emotion = (
-        max(emotion_scores.items(), key=lambda x: x[1])[0]
-        if any(emotion_scores.values())
-        else "neutral"
-    )
 
-    # Context-specific sentiment analysis
-    contexts = {
-        "product_quality": {
-            "keywords": ["calidad", "durabilidad", "material", "resistente"],
-            "weight": 1.2,
-        },
-        "price_value": {
-            "keywords": ["precio", "valor", "económico", "caro", "barato"],
-            "weight": 1.0,
-        },
-        "usability": {
-            "keywords": ["fácil", "sencillo", "intuitivo", "complicado"],
-            "weight": 1.1,
-        },
-        "customer_service": {
-            "keywords": ["atención", "soporte", "ayuda", "servicio"],
-            "weight": 0.9,
-        },
+# Words kept on each side of a sentiment word in contextual phrases
+PHRASE_WINDOW = 5
+
+
+def _sentiment_masks(matcher):
+    """Boolean term masks of ``matcher`` for the scores, built once per matcher."""
+    masks = getattr(matcher, "_sentiment_masks", None)
+    if masks is not None:
+        return masks
+    column = {term: i for i, term in enumerate(matcher.terms)}
+
+    def mask(label):
+        result = np.zeros(len(matcher.terms), dtype=bool)
+        result[[column[term] for term in matcher.lexicons[label]]] = True
+        return result
+
+    masks = {
+        "positive": mask(("sentiment", "positive")),
+        "negative": mask(("sentiment", "negative")),
+        "emotions": np.stack(
+            [mask(("emotion", e)) * EMOTIONS[e]["intensity"] for e in EMOTIONS],
+            axis=1,
+        ),
+        "contexts": {c: mask(("context", c)) for c in SENTIMENT_CONTEXTS},
+        "trends": np.stack([mask(("trend", t)) for t in TREND_INDICATORS]),
     }
+    matcher._sentiment_masks = masks
+    return masks
+
+
+def _score_hits(matcher, hits, word_counts):
+    """Vectorized scores for each row of a hit matrix."""
+    masks = _sentiment_masks(matcher)
+    positive = (hits & masks["positive"]).sum(axis=1)
+    negative = (hits & masks["negative"]).sum(axis=1)
+    total = positive + negative
+    polarity = np.divide(
+        positive - negative,
+        total,
+        out=np.zeros(len(hits)),
+        where=total > 0,
+    )
+    confidence = np.minimum(1.0, total / 10)
+    subjectivity = np.divide(
+        (hits & (masks["positive"] | masks["negative"])).sum(axis=1),
+        word_counts,
+        out=np.zeros(len(hits)),
+        where=word_counts > 0,
+    )
+    emotions = hits @ masks["emotions"]
+    emotion_totals = np.abs(emotions).sum(axis=1, keepdims=True)
+    emotions = np.divide(
+        emotions,
+        emotion_totals,
+        out=emotions.copy(),
+        where=emotion_totals > 0,
+    )
+    return {
+        "polarity": polarity,
+        "confidence": confidence,
+        "subjectivity": subjectivity,
+        "emotions": emotions,
+    }
+
+
+def _sentiment_labels(polarity):
+    """Sentiment labels for polarities, using the thresholds of ``score_polarity``."""
+    return np.where(
+        polarity > 0.2,
+        "positive",
+        np.where(polarity < -0.2, "negative", "neutral"),
+    )
+
+
+class SentimentBatch:
+    """
+    Sentiment scores for a batch of texts (usually one per review).
+
+    Every text is matched once against ``SENTIMENT_MATCHER``; the hits form
+    a text-by-term matrix, and polarity, confidence, subjectivity and
+    emotions are computed for all rows at once with NumPy. The words of all
+    texts are read once too, to note where each sentiment word first
+    occurs. The result for any group of texts, such as a whole corpus or the
+    reviews of one category, is a ``SentimentAggregate`` of their rows, so
+    it is derived from the matrix instead of re-reading the concatenated
+    text.
+    """
+
+    def __init__(self, texts, matcher=SENTIMENT_MATCHER):
+        self.texts = [text.lower() if text and text != "N/A" else "" for text in texts]
+        self.matcher = matcher
+        sentiment_terms = set(matcher.lexicons[("sentiment", "positive")]).union(
+            matcher.lexicons[("sentiment", "negative")]
+        )
+
+        split = [text.split() for text in self.texts]
+        self.word_counts = np.fromiter(map(len, split), np.int64, len(split))
+        self.hits = np.zeros((len(self.texts), len(matcher.terms)), dtype=bool)
+        self.hits[matcher.find_all(self.texts, split)] = True
+
+        # Per text, the word position of the first occurrence of every
+        # sentiment word, for contextual phrases
+        self.first_positions = {}
+        words = list(chain.from_iterable(split))
+        is_sentiment = np.fromiter(
+            map(sentiment_terms.__contains__, words), dtype=bool, count=len(words)
+        )
+        positions = np.flatnonzero(is_sentiment)
+        rows = np.repeat(np.arange(len(split)), self.word_counts)[positions]
+        starts = (np.cumsum(self.word_counts) - self.word_counts)[rows]
+        for position, row, start in zip(
+            positions.tolist(), rows.tolist(), starts.tolist()
+        ):
+            first = self.first_positions.setdefault(row, {})
+            first.setdefault(words[position], position - start)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def scores(self):
+        """
+        Per-text scores: ``polarity``, ``confidence`` and ``subjectivity``
+        arrays, plus ``emotions`` with one column per emotion in ``EMOTIONS``.
+        """
+        return _score_hits(self.matcher, self.hits, self.word_counts)
+
+    def aggregate(self, rows=None):
+        """
+        The ``SentimentAggregate`` of the texts in ``rows`` (all texts when
+        omitted), taken in that order as one document.
+        """
+        rows = np.arange(len(self.texts)) if rows is None else np.asarray(rows, int)
+        rows = rows[self.word_counts[rows] > 0]
+        aggregate = SentimentAggregate(self.matcher)
+        if not len(rows):
+            return aggregate
+
+        hits = self.hits[rows]
+        word_counts = self.word_counts[rows]
+        aggregate.hits = hits.any(axis=0)
+        aggregate.texts = len(rows)
+        aggregate.words = int(word_counts.sum())
+        polarity = _score_hits(self.matcher, hits, word_counts)["polarity"]
+        values, counts = np.unique(polarity, return_counts=True)
+        aggregate.polarities.update(dict(zip(values.tolist(), counts.tolist())))
+
+        # Only the texts holding a window are split again
+        rows = rows.tolist()
+        split = {}
+
+        def words(k):
+            if k not in split:
+                split[k] = self.texts[rows[k]].split()
+            return split[k]
+
+        def before(k, position):
+            collected = words(k)[:position][-PHRASE_WINDOW:]
+            while len(collected) < PHRASE_WINDOW and k > 0:
+                k -= 1
+                collected = words(k)[-(PHRASE_WINDOW - len(collected)) :] + collected
+            return collected
+
+        def after(k, position):
+            collected = words(k)[position : position + PHRASE_WINDOW]
+            while len(collected) < PHRASE_WINDOW and k < len(rows) - 1:
+                k += 1
+                collected += words(k)[: PHRASE_WINDOW - len(collected)]
+            return collected
+
+        start = 0
+        for k, row in enumerate(rows):
+            for word, position in self.first_positions.get(row, {}).items():
+                if word not in aggregate.phrases:
+                    aggregate.phrases[word] = [
+                        start + position,
+                        before(k, position),
+                        after(k, position + 1),
+                    ]
+            start += int(self.word_counts[row])
+        aggregate.head = after(0, 0)
+        aggregate.tail = before(len(rows) - 1, len(words(len(rows) - 1)))
+        return aggregate
+
+    def summary(self, rows=None):
+        """
+        Sentiment of the texts in ``rows`` (all texts when omitted) taken as
+        one document, in the format returned by ``analyze_sentiment``.
+        """
+        return self.aggregate(rows).summary()
+
+    def distribution(self):
+        """Counts of positive, neutral and negative texts, and their mean polarity."""
+        return self.aggregate().distribution()
+
+
+class SentimentAggregate:
+    """
+    Mergeable sentiment state of a group of texts taken as one document.
+
+    Holds the union of the texts' term hits, word and text counts, how many
+    texts have each polarity, and each sentiment word's first position with
+    up to ``PHRASE_WINDOW`` words on each side. The group's first and last
+    words let ``merge()`` complete windows cut off at a slice edge.
+    """
+
+    def __init__(self, matcher=SENTIMENT_MATCHER):
+        self.matcher = matcher
+        self.hits = np.zeros(len(matcher.terms), dtype=bool)
+        self.texts = 0
+        self.words = 0
+        self.polarities = Counter()
+        # word -> [position in the document, words before, words after]
+        self.phrases = {}
+        self.head = []
+        self.tail = []
+
+    def merge(self, other):
+        """Appends the texts aggregated in ``other`` after this group's texts."""
+        if not other.texts:
+            return self
+        for position, _, following in self.phrases.values():
+            missing = PHRASE_WINDOW - len(following)
+            # Windows that reached the end of this group go on into ``other``
+            if missing and position + 1 + len(following) == self.words:
+                following.extend(other.head[:missing])
+        for word, (position, preceding, following) in other.phrases.items():
+            if word in self.phrases:
+                continue
+            missing = PHRASE_WINDOW - len(preceding)
+            if missing and position == len(preceding):
+                preceding = self.tail[-missing:] + preceding
+            self.phrases[word] = [self.words + position, preceding, list(following)]
+        self.head = (self.head + other.head)[:PHRASE_WINDOW]
+        self.tail = (self.tail + other.tail)[-PHRASE_WINDOW:]
+        self.hits = self.hits | other.hits
+        self.texts += other.texts
+        self.words += other.words
+        self.polarities.update(other.polarities)
+        return self
+
+    def summary(self):
+        """The group's sentiment, in the format returned by ``analyze_sentiment``."""
+        if not self.texts:
+            return _empty_sentiment()
+
+        masks = _sentiment_masks(self.matcher)
+        hits = self.hits
+        scores = _score_hits(self.matcher, hits[np.newaxis], np.array([self.words]))
+        positive_count = int((hits & masks["positive"]).sum())
+        negative_count = int((hits & masks["negative"]).sum())
+        overall = score_polarity(positive_count, negative_count)
+
+        emotion_scores = {
+            emotion: float(score)
+            for emotion, score in zip(EMOTIONS, scores["emotions"][0])
+        }
+        dominant_emotion = (
+            max(emotion_scores.items(), key=lambda x: x[1])[0]
+            if any(emotion_scores.values())
+            else "neutral"
+        )
+
+        # Sentiment of the context keywords present in the texts
+        context_scores = {}
+        for context, data in SENTIMENT_CONTEXTS.items():
+            context_hits = hits & masks["contexts"][context]
+            if context_hits.any():
+                context_sentiment = score_polarity(
+                    int((context_hits & masks["positive"]).sum()),
+                    int((context_hits & masks["negative"]).sum()),
+                )
+                context_scores[context] = {
+                    "sentiment": context_sentiment["sentiment"],
+                    "polarity": context_sentiment["polarity"] * data["weight"],
+                    "confidence": context_sentiment["confidence"],
+                }
+
+        trend_scores = dict(zip(TREND_INDICATORS, (masks["trends"] & hits).sum(axis=1)))
+
+        phrases = []
+        for word in sorted(self.phrases):
+            position, preceding, following = self.phrases[word]
+            window = preceding + [word] + following
+            phrases.append(
+                {
+                    "phrase": " ".join(window),
+                    "sentiment_context": [w for w in window if w in SENTIMENT_WORDS],
+                    "position": position / self.words,
+                }
+            )
+        contextual_phrases = sorted(
+            phrases, key=lambda x: len(x["sentiment_context"]), reverse=True
+        )[:5]
+
+        return {
+            "sentiment": overall["sentiment"],
+            "polarity": overall["polarity"],
+            "subjectivity": float(scores["subjectivity"][0]),
+            "confidence": overall["confidence"],
+            "key_phrases": [p["phrase"] for p in contextual_phrases],
+            "emotions": emotion_scores,
+            "dominant_emotion": dominant_emotion,
+            "emotional_intensity": sum(abs(score) for score in emotion_scores.values()),
+            "context_sentiment": context_scores,
+            "sentiment_trend": max(trend_scores.items(), key=lambda x: x[1])[0]
+            if any(trend_scores.values())
+            else "neutral",
+            "contextual_phrases": contextual_phrases,
+        }
+
+    def distribution(self):
+        """Counts of positive, neutral and negative texts, and their mean polarity."""
+        labels = Counter()
+        for polarity, count in self.polarities.items():
+            labels[_sentiment_labels(polarity).item()] += count
+        # Exact sum of the polarities, rounded once
+        total = sum(
+            Fraction(polarity) * count for polarity, count in self.polarities.items()
+        )
+        return {
+            "positive": labels["positive"],
+            "neutral": labels["neutral"],
+            "negative": labels["negative"],
+            "mean_polarity": float(total) / self.texts if self.texts else 0.0,
+        }
+
+
+def analyze_sentiment(text):
+    """Performs detailed sentiment analysis on text with Spanish language support."""
+    if not text or text == "N/A":
+        return _empty_sentiment()
+    return SentimentBatch([text]).summary()
+
+
+# --- Text Index ---
+
+
+class TextIndex:
+    """
+    Inverted index over a list of documents: each word token maps to the
+    documents containing it and how many times.
+
+    Keyword lookups keep the substring semantics of the ``in`` checks they
+    replace. A single-word keyword matches every token that contains it,
+    found with one search over the joined vocabulary. A phrase is confirmed
+    against the documents that contain all of its words. Lookups are cached,
+    so each extra keyword category costs a lookup rather than another pass
+    over the corpus.
+    """
+
+    def __init__(self, texts):
+        self.texts = [text.lower() if text and text != "N/A" else "" for text in texts]
+        self.postings = {}
+        for doc, text in enumerate(self.texts):
+            for token, count in Counter(TOKEN_RE.findall(text)).items():
+                postings = self.postings.get(token)
+                if postings is None:
+                    self.postings[token] = {doc: count}
+                else:
+                    postings[doc] = count
+        self._vocabulary = list(self.postings)
+        self._joined = "\n".join(self._vocabulary)
+        self._offsets = []
+        offset = 0
+        for token in self._vocabulary:
+            self._offsets.append(offset)
+            offset += len(token) + 1
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _containing(self, word):
+        """Documents with a token that contains ``word``."""
+        docs = set()
+        last = None
+        for match in re.finditer(re.escape(word), self._joined):
+            token = bisect_right(self._offsets, match.start()) - 1
+            if token != last:
+                docs.update(self.postings[self._vocabulary[token]])
+                last = token
+        return docs
+
+    def documents(self, keyword, start=0, stop=None):
+        """
+        Ids of the documents containing ``keyword``, restricted to
+        ``start <= id < stop`` and returned relative to ``start``.
+        """
+        keyword = keyword.lower()
+        docs = self._cache.get(keyword)
+        if docs is None:
+            words = TOKEN_RE.findall(keyword)
+            if words == [keyword]:
+                docs = self._containing(keyword)
+            else:
+                candidates = (
+                    set.intersection(*(self._containing(word) for word in words))
+                    if words
+                    else range(len(self.texts))
+                )
+                docs = {doc for doc in candidates if keyword in self.texts[doc]}
+            self._cache[keyword] = docs
+        stop = len(self.texts) if stop is None else stop
+        if start == 0 and stop == len(self.texts):
+            return set(docs)
+        return {doc - start for doc in docs if start <= doc < stop}
+
+    def count(self, keywords, start=0, stop=None):
+        """Number of ``(document, keyword)`` pairs where the keyword occurs."""
+        return sum(len(self.documents(keyword, start, stop)) for keyword in keywords)
+
+    def any_of(self, keywords, start=0, stop=None):
+        """Ids of the documents containing any of ``keywords``."""
+        docs = set()
+        for keyword in keywords:
+            docs |= self.documents(keyword, start, stop)
+        return docs
+
+
+# --- Customer Feedback ---
+
+SATISFACTION_INDICATORS = {
+    "very_satisfied": [
+        "excelente",
+        "perfecto",
+        "increíble",
+        "maravilloso",
+        "fantástico",
+    ],
+    "satisfied": ["bueno", "bien", "recomiendo", "cumple", "funciona"],
+    "neutral": ["normal", "regular", "aceptable", "básico"],
+    "dissatisfied": ["malo", "problema", "falla", "lento", "caro"],
+    "very_dissatisfied": [
+        "pésimo",
+        "terrible",
+        "horrible",
+        "decepción",
+        "no funciona",
+    ],
+}
+
+FEEDBACK_THEMES = {
+    "price": ["precio", "costo", "caro", "barato", "económico"],
+    "quality": ["calidad", "durabilidad", "resistente", "premium"],
+    "performance": ["rápido", "velocidad", "rendimiento", "eficiente"],
+    "usability": ["fácil", "sencillo", "intuitivo", "complicado"],
+    "support": ["atención", "soporte", "ayuda", "servicio"],
+    "delivery": ["envío", "entrega", "llegada", "shipping"],
+}
+
+# Sentences quoted in the feedback, by the list they are collected in
+FEEDBACK_SENTENCES = {
+    "specific_issues": ["problema", "falla", "error", "defecto", "no funciona"],
+    "praise_points": ["excelente", "bueno", "genial", "perfecto", "recomiendo"],
+    "suggestions": [
+        "mejorar",
+        "sugerencia",
+        "recomendación",
+        "debería",
+        "podría",
+    ],
+}
+
+# Sentences quoted per list
+FEEDBACK_SENTENCE_LIMIT = 5
+
+
+def trie_pattern(terms):
+    """
+    Compiles literal ``terms`` into a regex alternation shaped like a trie,
+    so shared prefixes are only tried once at each position. The pattern
+    prefers the longest term.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        alternatives = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1:
+            body = alternatives[0]
+        else:
+            body = "(?:" + "|".join(alternatives) + ")"
+        return f"(?:{body})?" if "" in node else body
 
-    context_scores = {}
-    for context, data in contexts.items():
-        context_text = " ".join(
-            word
-            for word in text_lower.split()
-            if any(kw in word for kw in data["keywords"])
-        )
-        if context_text:
-            context_sentiment = analyze_context_sentiment(
-                context_text, positive_words, negative_words
-            )
-            context_scores[context] = {
-                "sentiment": context_sentiment["sentiment"],
-                "polarity": context_sentiment["polarity"] * data["weight"],
-                "confidence": context_sentiment["confidence"],
-            }
+    return build(trie)
 
-    # Sentiment trend detection
-    trend_indicators = {
-        "improving": ["mejoró", "superó", "avanzó", "evolucionó", "progresó"],
-        "declining": ["empeoró", "degradó", "retrocedió", "falló", "decepcionó"],
-        "stable": ["mantiene", "consistente", "estable", "igual", "similar"],
-    }
 
-    trend_scores = {trend: 0 for trend in trend_indicators}
-    for trend, indicators in trend_indicators.items():
-        trend_scores[trend] = sum(
-            1 for indicator in indicators if indicator in text_lower
-        )
+class IndicatorMatcher:
+    """
+    Finds every occurrence of labelled indicator substrings in one pass.
 
-    # Enhanced key phrase extraction with context
-    def extract_contextual_phrases(text, word, window=5):
-        words = text.lower().split()
-        try:
-            idx = words.index(word)
-            start = max(0, idx - window)
-            end = min(len(words), idx + window + 1)
-            phrase = " ".join(words[start:end])
-
-            sentiment_words = positive_words.union(negative_words)
-            sentiment_context = [w for w in words[start:end] if w in sentiment_words]
-
-            return {
-                "phrase": phrase,
-                "sentiment_context": sentiment_context,
-                "position": idx / len(words),
-            }
-        except ValueError:
-            return None
+    Unlike ``LexiconMatcher``, indicators match anywhere in the text, also
+    inside longer words, like the ``in`` checks they replace. All indicators
+    are compiled into one lookahead trie pattern, so a single regex scan
+    reports the labels of every indicator at every position.
+    """
 
-    contextual_phrases = []
-    for word in positive_words.union(negative_words):
-        if word in text_lower:
-            phrase_data = extract_contextual_phrases(text_lower, word)
-            if phrase_data:
-                contextual_phrases.append(phrase_data)
+    def __init__(self, indicators):
+        labels = {}
+        for label, terms in indicators.items():
+            for term in terms:
+                labels.setdefault(term, set()).add(label)
+        self._pattern = re.compile("(?=(" + trie_pattern(labels) + "))")
+        # The pattern reports the longest indicator at each position;
+        # indicators that are prefixes of it start there too
+        self._labels = {
+            term: frozenset().union(
+                *(labels[other] for other in labels if term.startswith(other))
+            )
+            for term in labels
+        }
 
-    # Calculate confidence based on the strength of sentiment indicators
-    confidence = min(1.0, (positive_count + negative_count) / 10)
+    def finditer(self, text):
+        """Yields ``(position, labels)`` for each indicator found in ``text``."""
+        for match in self._pattern.finditer(text):
+            yield match.start(), self._labels[match.group(1)]
 
-    return {
-        "sentiment": sentiment,
-        "polarity": polarity,
-        "subjectivity": subjectivity,
-        "confidence": confidence,
-        "key_phrases": [
-            p["phrase"]
-            for p in sorted(
-                contextual_phrases,
-                key=lambda x: len(x["sentiment_context"]),
-                reverse=True,
-            )[:5]
-        ],
-        "emotions": emotion_scores,
-        "dominant_emotion": dominant_emotion,
-        "emotional_intensity": sum(abs(score) for score in emotion_scores.values()),
-        "context_sentiment": context_scores,
-        "sentiment_trend": max(trend_scores.items(), key=lambda x: x[1])[0]
-        if any(trend_scores.values())
-        else "neutral",
-        "contextual_phrases": sorted(
-            contextual_phrases, key=lambda x: len(x["sentiment_context"]), reverse=True
-        )[:5],
+
+FEEDBACK_MATCHER = IndicatorMatcher(
+    {
+        **{("satisfaction", k): v for k, v in SATISFACTION_INDICATORS.items()},
+        **{("sentence", k): v for k, v in FEEDBACK_SENTENCES.items()},
     }
+)
 
 
-def extract_customer_feedback(text_list):
-    """Extracts detailed customer feedback from text."""
+def extract_customer_feedback(text_list, index=None, start=0):
+    """
+    Extracts detailed customer feedback from text.
+
+    Each review is lowercased and split into sentences once, and a single
+    ``FEEDBACK_MATCHER`` scan tags the review and its sentences with the
+    satisfaction and sentence indicators. Quoted sentences are deduplicated
+    as they stream in, keeping the first ``FEEDBACK_SENTENCE_LIMIT``
+    distinct ones per list. Themes are counted from ``index``, a
+    ``TextIndex`` in which the reviews are documents ``start`` onwards
+    (one is built when omitted).
+    """
     feedback = {
         "satisfaction_levels": {
             "very_satisfied": 0,
@@ -727,95 +3115,84 @@ def extract_customer_feedback(text_list):
         "suggestions": [],
     }
 
-    satisfaction_indicators = {
-        "very_satisfied": [
-            "excelente",
-            "perfecto",
-            "increíble",
-            "maravilloso",
-            "fantástico",
-        ],
-        "satisfied": ["bueno", "bien", "recomiendo", "cumple", "funciona"],
-        "neutral": ["normal", "regular", "aceptable", "básico"],
-        "dissatisfied": ["malo", "problema", "falla", "lento", "caro"],
-        "very_dissatisfied": [
-            "pésimo",
-            "terrible",
-            "horrible",
-            "decepción",
-            "no funciona",
-        ],
-    }
-
     for text in text_list:
         if not text or text == "N/A":
             continue
 
         text_lower = text.lower()
+        sentences = text.split(".")
+        # Offsets where each lowercased sentence ends, to place matches
+        sentence_ends = []
+        offset = -1
+        for sentence in text_lower.split("."):
+            offset += len(sentence) + 1
+            sentence_ends.append(offset)
+
+        review_labels = set()
+        sentence_labels = {}
+        for position, labels in FEEDBACK_MATCHER.finditer(text_lower):
+            review_labels |= labels
+            number = bisect_left(sentence_ends, position)
+            sentence_labels.setdefault(number, set()).update(labels)
 
         # Analyze satisfaction level
-        for level, indicators in satisfaction_indicators.items():
-            if any(indicator in text_lower for indicator in indicators):
+        for level in SATISFACTION_INDICATORS:
+            if ("satisfaction", level) in review_labels:
                 feedback["satisfaction_levels"][level] += 1
                 break
 
-        # Extract common themes
-        themes = {
-            "price": ["precio", "costo", "caro", "barato", "económico"],
-            "quality": ["calidad", "durabilidad", "resistente", "premium"],
-            "performance": ["rápido", "velocidad", "rendimiento", "eficiente"],
-            "usability": ["fácil", "sencillo", "intuitivo", "complicado"],
-            "support": ["atención", "soporte", "ayuda", "servicio"],
-            "delivery": ["envío", "entrega", "llegada", "shipping"],
-        }
+        # Extract the sentences containing issues, praise and suggestions
+        for key in FEEDBACK_SENTENCES:
+            quoted = feedback[key]
+            if len(quoted) >= FEEDBACK_SENTENCE_LIMIT:
+                continue
+            for number in sorted(sentence_labels):
+                if ("sentence", key) in sentence_labels[number]:
+                    sentence = sentences[number].strip()
+                    if sentence not in quoted:
+                        quoted.append(sentence)
+                        if len(quoted) >= FEEDBACK_SENTENCE_LIMIT:
+                            break
 
-        for theme, keywords in themes.items():
-            if any(keyword in text_lower for keyword in keywords):
-                feedback["common_themes"][theme] += 1
-
-        # Extract specific issues
-        issue_indicators = ["problema", "falla", "error", "defecto", "no funciona"]
-        if any(indicator in text_lower for indicator in issue_indicators):
-            # Get the sentence containing the issue
-            sentences = text.split(".")
-            for sentence in sentences:
-                if any(indicator in sentence.lower() for indicator in issue_indicators):
-                    feedback["specific_issues"].append(sentence.strip())
-
-        # Extract praise points
-        praise_indicators = ["excelente", "bueno", "genial", "perfecto", "recomiendo"]
-        if any(indicator in text_lower for indicator in praise_indicators):
-            sentences = text.split(".")
-            for sentence in sentences:
-                if any(
-                    indicator in sentence.lower() for indicator in praise_indicators
-                ):
-                    feedback["praise_points"].append(sentence.strip())
-
-        # Extract suggestions
-        suggestion_indicators = [
-            "mejorar",
-            "sugerencia",
-            "recomendación",
-            "debería",
-            "podría",
-        ]
-        if any(indicator in text_lower for indicator in suggestion_indicators):
-            sentences = text.split(".")
-            for sentence in sentences:
-                if any(
-                    indicator in sentence.lower() for indicator in suggestion_indicators
-                ):
-                    feedback["suggestions"].append(sentence.strip())
-
-    # Clean up and limit lists
-    feedback["specific_issues"] = list(set(feedback["specific_issues"]))[:5]
-    feedback["praise_points"] = list(set(feedback["praise_points"]))[:5]
-    feedback["suggestions"] = list(set(feedback["suggestions"]))[:5]
+    # Extract common themes, in order of first appearance like the per-review
+    # counts they replace
+    if index is None:
+        index = TextIndex(text_list)
+    stop = start + len(text_list)
+    theme_docs = {
+        theme: index.any_of(keywords, start, stop)
+        for theme, keywords in FEEDBACK_THEMES.items()
+    }
+    for _, _, theme in sorted(
+        (min(docs), position, theme)
+        for position, (theme, docs) in enumerate(theme_docs.items())
+        if docs
+    ):
+        feedback["common_themes"][theme] = len(theme_docs[theme])
 
     return feedback
 
 
+def merge_customer_feedback(parts):
+    """
+    Combines ``extract_customer_feedback`` results for consecutive slices of
+    reviews into the result for all of them.
+    """
+    merged = extract_customer_feedback([])
+    for part in parts:
+        for level, count in part["satisfaction_levels"].items():
+            merged["satisfaction_levels"][level] += count
+        merged["common_themes"].update(part["common_themes"])
+        for key in FEEDBACK_SENTENCES:
+            quoted = merged[key]
+            for sentence in part[key]:
+                if len(quoted) >= FEEDBACK_SENTENCE_LIMIT:
+                    break
+                if sentence not in quoted:
+                    quoted.append(sentence)
+    return merged
+
+
 def extract_keywords(text):
     """Extracts top keywords from text."""
     if not text:  # Handle empty string
@@ -889,14 +3266,334 @@ def extract_keywords(text):
     return [word for word, count in word_counts.most_common(5)]  # Top 5 keywords
 
 
-def extract_insights(product_data):
+# --- Insights ---
+
+# Products aggregated at a time when insights are computed from a stream
+INSIGHTS_SLICE_SIZE = 1000
+
+# Product features looked for in descriptions
+FEATURE_KEYWORDS = {
+    "material": [
+        "material",
+        "tela",
+        "algodón",
+        "poliéster",
+        "cuero",
+        "plástico",
+        "metal",
+        "madera",
+        "acero",
+        "aluminio",
+        "fibra",
+        "sintético",
+        "natural",
+    ],
+    "size": [
+        "talle",
+        "tamaño",
+        "medida",
+        "dimensiones",
+        "largo",
+        "ancho",
+        "alto",
+        "profundidad",
+        "peso",
+        "capacidad",
+        "volumen",
+    ],
+    "color": [
+        "color",
+        "colores",
+        "tono",
+        "multicolor",
+        "estampado",
+        "diseño",
+        "patrón",
+        "motivo",
+    ],
+    "brand": [
+        "marca",
+        "original",
+        "genuino",
+        "auténtico",
+        "oficial",
+        "certificado",
+    ],
+    "condition": [
+        "nuevo",
+        "usado",
+        "reacondicionado",
+        "restaurado",
+        "seminuevo",
+        "como nuevo",
+    ],
+    "warranty": [
+        "garantía",
+        "garantizado",
+        "devolución",
+        "cambio",
+        "servicio técnico",
+        "soporte",
+    ],
+    "shipping": [
+        "envío",
+        "entrega",
+        "gratis",
+        "gratuito",
+        "sin cargo",
+        "retiro",
+        "pickup",
+        "sucursal",
+    ],
+    "package": [
+        "incluye",
+        "contenido",
+        "accesorios",
+        "manual",
+        "instrucciones",
+        "caja",
+        "embalaje",
+    ],
+    "quality": [
+        "calidad",
+        "premium",
+        "resistente",
+        "durable",
+        "robusto",
+        "fuerte",
+        "resistencia",
+    ],
+    "design": [
+        "diseño",
+        "estilo",
+        "moderno",
+        "clásico",
+        "elegante",
+        "exclusivo",
+        "único",
+    ],
+    "comfort": [
+        "cómodo",
+        "ergonómico",
+        "suave",
+        "flexible",
+        "adaptable",
+        "ajustable",
+    ],
+    "safety": [
+        "seguro",
+        "certificado",
+        "normas",
+        "estándar",
+        "aprobado",
+        "testeado",
+    ],
+    "maintenance": [
+        "mantenimiento",
+        "limpieza",
+        "cuidado",
+        "lavado",
+        "conservación",
+    ],
+    "compatibility": [
+        "compatible",
+        "universal",
+        "adaptador",
+        "conexión",
+        "acoplamiento",
+    ],
+    "sustainability": [
+        "ecológico",
+        "sustentable",
+        "reciclable",
+        "biodegradable",
+        "ambiental",
+    ],
+}
+
+# Review topics scored separately
+SENTIMENT_CATEGORIES = {
+    "quality": ["calidad", "durabilidad", "resistente", "premium"],
+    "performance": ["rápido", "velocidad", "rendimiento", "eficiente"],
+    "value": ["precio", "valor", "económico", "caro", "barato"],
+    "usability": ["fácil", "sencillo", "intuitivo", "complicado", "difícil"],
+}
+
+
+def _add_exact(partials, x):
     """
-    Analyzes product data to extract comprehensive marketing insights.
-    Provides structured analysis of pricing, features, customer sentiment, and competitive positioning.
+    Adds ``x`` to a running sum kept as non-overlapping float ``partials``
+    (Shewchuk's algorithm, as used by ``math.fsum``), so the sum stays exact.
+    """
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+class PriceStats:
+    """
+    Streaming, mergeable price statistics.
+
+    Prices are fed one at a time with ``add`` and shards are combined with
+    ``merge``. Count, min, max and exact running sums of prices and squared
+    prices are kept, so the mean and standard deviation do not depend on how
+    the prices were sharded. Up to ``exact_limit`` prices are also kept
+    as-is, which makes segment counts and percentiles exact. Past that limit
+    they are folded into logarithmic buckets with ``relative_accuracy``, so
+    memory stays bounded however many prices are added.
+    """
+
+    def __init__(self, exact_limit=4096, relative_accuracy=0.01):
+        """
+        Segment counts and percentiles are exact up to ``exact_limit`` prices
+        and within ``relative_accuracy`` of the true value past it; ``exact``
+        tells which applies.
+        """
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._sum = []
+        self._sum_squares = []
+        self._values = []
+        self._buckets = None
+        self._zeros = 0
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, price):
+        """Adds one price."""
+        self.count += 1
+        self.min = price if self.min is None else min(self.min, price)
+        self.max = price if self.max is None else max(self.max, price)
+        _add_exact(self._sum, price)
+        _add_exact(self._sum_squares, price * price)
+        if self._buckets is None:
+            self._values.append(price)
+            if len(self._values) > self.exact_limit:
+                self._fold()
+        else:
+            self._bucket(price)
+
+    def merge(self, other):
+        """Adds every price summarized by ``other``; returns ``self``."""
+        if not other.count:
+            return self
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for partial in other._sum:
+            _add_exact(self._sum, partial)
+        for partial in other._sum_squares:
+            _add_exact(self._sum_squares, partial)
+        if other._buckets is None:
+            if self._buckets is None:
+                self._values.extend(other._values)
+                if len(self._values) > self.exact_limit:
+                    self._fold()
+            else:
+                for price in other._values:
+                    self._bucket(price)
+        else:
+            if self._buckets is None:
+                self._fold()
+            self._buckets.update(other._buckets)
+            self._zeros += other._zeros
+        return self
+
+    def _fold(self):
+        """Moves the exact prices into logarithmic buckets."""
+        self._buckets = Counter()
+        for price in self._values:
+            self._bucket(price)
+        self._values = []
+
+    def _bucket(self, price):
+        if price <= 0:
+            self._zeros += 1
+        else:
+            self._buckets[math.ceil(math.log(price) / self._log_gamma)] += 1
+
+    def _representative(self, index):
+        """Value reported for the prices in bucket ``index``."""
+        value = 2 * self._gamma**index / (self._gamma + 1)
+        return min(max(value, self.min), self.max)
+
+    @property
+    def exact(self):
+        """Whether segment counts and percentiles are computed from every price."""
+        return self._buckets is None
+
+    @property
+    def mean(self):
+        return math.fsum(self._sum) / self.count if self.count else None
+
+    @property
+    def std_dev(self):
+        """Sample standard deviation, computed from the exact sums."""
+        if self.count < 2:
+            return 0.0 if self.count else None
+        total = sum(map(Fraction, self._sum))
+        squares = sum(map(Fraction, self._sum_squares))
+        variance = (squares - total * total / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0))
+
+    def count_below(self, threshold):
+        """Number of prices strictly below ``threshold``."""
+        if self._buckets is None:
+            return sum(1 for price in self._values if price < threshold)
+        below = self._zeros if threshold > 0 else 0
+        for index, count in self._buckets.items():
+            if self._representative(index) < threshold:
+                below += count
+        return below
+
+    def count_above(self, threshold):
+        """Number of prices strictly above ``threshold``."""
+        if self._buckets is None:
+            return sum(1 for price in self._values if price > threshold)
+        above = 0 if threshold >= 0 else self._zeros
+        for index, count in self._buckets.items():
+            if self._representative(index) > threshold:
+                above += count
+        return above
+
+    def percentile(self, q):
+        """The ``q``-th percentile (0-100), interpolated between ranks."""
+        if not self.count:
+            return None
+        rank = (self.count - 1) * q / 100
+        if self._buckets is None:
+            values = sorted(self._values)
+            low = math.floor(rank)
+            high = min(low + 1, len(values) - 1)
+            return values[low] + (values[high] - values[low]) * (rank - low)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                return self._representative(index)
+        return self.max
+
+
+def partial_insights(product_data):
+    """
+    Map step of ``extract_insights``: aggregates one slice of
+    ``product_data`` into state that ``merge_insights`` can combine with
+    the state of other slices.
     """
     # Initialize data structures
-    price_data = []
-    feature_mentions = Counter()
+    price_stats = PriceStats()
     all_reviews_text = []
     all_descriptions_text = []
     category_distribution = Counter()
@@ -904,251 +3601,191 @@ def extract_insights(product_data):
     # Collect and process data
     for product in product_data:
         # Price analysis
-        if product.get("price") != "N/A":
-            try:
-                price = float(product["price"].replace(".", "").replace(",", "."))
-                price_data.append(price)
-            except (ValueError, AttributeError):
-                pass
+        if product.price is not None:
+            price_stats.add(product.price)
 
         # Category analysis
-        if product.get("category_path") != "N/A":
-            category_distribution[product["category_path"]] += 1
+        if product.category_path is not None:
+            category_distribution[product.category_path] += 1
 
         # Collect text data
-        all_reviews_text.extend(product.get("review_snippets", []))
-        if product.get("description"):
-            all_descriptions_text.append(product["description"])
+        all_reviews_text.extend(product.review_snippets)
+
+        if product.description:
+            all_descriptions_text.append(product.description)
+
+    # One index over descriptions and reviews answers every keyword table
+    index = TextIndex(all_descriptions_text + all_reviews_text)
+    # Descriptions come first in the index; reviews start at this document id
+    first_review_offset = len(all_descriptions_text)
+    feature_analysis = {
+        category: index.count(keywords, 0, first_review_offset)
+        for category, keywords in FEATURE_KEYWORDS.items()
+    }
+    # Reviews are scored here; only bounded aggregates leave the worker
+    batch = SentimentBatch(all_reviews_text)
+    review_categories = {
+        category: batch.aggregate(sorted(index.any_of(keywords, first_review_offset)))
+        for category, keywords in SENTIMENT_CATEGORIES.items()
+    }
+
+    return {
+        "price_stats": price_stats,
+        "category_distribution": category_distribution,
+        "feature_analysis": feature_analysis,
+        "reviews": batch.aggregate(),
+        "review_categories": review_categories,
+        "feedback": extract_customer_feedback(
+            all_reviews_text, index, first_review_offset
+        ),
+    }
+
+
+def merge_insights(partials):
+    """
+    Reduce step of ``extract_insights``: combines ``partial_insights``
+    states, in the order of the slices they were computed from.
+    """
+    merged = {
+        "price_stats": PriceStats(),
+        "category_distribution": Counter(),
+        "feature_analysis": {category: 0 for category in FEATURE_KEYWORDS},
+        "reviews": SentimentAggregate(),
+        "review_categories": {
+            category: SentimentAggregate() for category in SENTIMENT_CATEGORIES
+        },
+    }
+    for partial in partials:
+        merged["price_stats"].merge(partial["price_stats"])
+        merged["category_distribution"].update(partial["category_distribution"])
+        for category, mentions in partial["feature_analysis"].items():
+            merged["feature_analysis"][category] += mentions
+        merged["reviews"].merge(partial["reviews"])
+        for category, aggregate in partial["review_categories"].items():
+            merged["review_categories"][category].merge(aggregate)
+    merged["feedback"] = merge_customer_feedback(
+        [partial["feedback"] for partial in partials]
+    )
+    return merged
+
+
+def reduce_insights(slices, workers=1):
+    """
+    Runs ``partial_insights`` over ``slices``, an iterable of product lists,
+    and merges the states in order. With ``workers`` > 1 the slices go to a
+    process pool, at most ``workers`` at a time, so only that many slices
+    are held however long ``slices`` is.
+    """
+    state = merge_insights([])
+    if workers <= 1:
+        for products in slices:
+            state = merge_insights([state, partial_insights(products)])
+        return state
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        running = deque()
+        for products in slices:
+            running.append(executor.submit(partial_insights, products))
+            if len(running) >= workers:
+                state = merge_insights([state, running.popleft().result()])
+        while running:
+            state = merge_insights([state, running.popleft().result()])
+    return state
+
+
+def product_slices(products, size=INSIGHTS_SLICE_SIZE):
+    """Groups an iterable of products into lists of up to ``size``."""
+    products = iter(products)
+    while products_slice := list(islice(products, size)):
+        yield products_slice
+
+
+def extract_insights(product_data, workers=1):
+    """
+    Analyzes product data to extract comprehensive marketing insights.
+    Provides structured analysis of pricing, features, customer sentiment, and competitive positioning.
+
+    With ``workers`` > 1 the products are split into contiguous slices that
+    are aggregated in a process pool and merged; the result is identical to
+    the serial path.
+    """
+    if workers > 1 and len(product_data) > 1:
+        size = -(-len(product_data) // workers)
+        slices = [product_data[i : i + size] for i in range(0, len(product_data), size)]
+    else:
+        slices, workers = [product_data], 1
+    return build_insights(reduce_insights(slices, workers))
+
+
+def build_insights(state):
+    """Builds the insights report from merged ``partial_insights`` state."""
+    price_stats = state["price_stats"]
+    category_distribution = state["category_distribution"]
+    feature_analysis = state["feature_analysis"]
 
     # Price Analysis
+    avg_price = price_stats.mean
+    if price_stats.count:
+        budget = price_stats.count_below(avg_price * 0.7)
+        premium = price_stats.count_above(avg_price * 1.3)
+        mid_range = price_stats.count - budget - premium
+    else:
+        budget = mid_range = premium = 0
     price_insights = {
         "price_range": {
-            "min": min(price_data) if price_data else "N/A",
-            "max": max(price_data) if price_data else "N/A",
-            "avg": sum(price_data) / len(price_data) if price_data else "N/A",
+            "min": price_stats.min if price_stats.count else "N/A",
+            "max": price_stats.max if price_stats.count else "N/A",
+            "avg": avg_price if price_stats.count else "N/A",
         },
         "price_segments": {
-            "budget": len(
-                [p for p in price_data if p < sum(price_data) / len(price_data) * 0.7]
-            )
-            if price_data
-            else 0,
-            "mid_range": len(
-                [
-                    p
-                    for p in price_data
-                    if sum(price_data) / len(price_data) * 0.7
-                    <= p
-                    <= sum(price_data) / len(price_data) * 1.3
-                ]
-            )
-            if price_data
-            else 0,
-            "premium": len(
-                [p for p in price_data if p > sum(price_data) / len(price_data) * 1.3]
-            )
-            if price_data
-            else 0,
+            "budget": budget,
+            "mid_range": mid_range,
+            "premium": premium,
+        },
+        "price_distribution": {
+            "std_dev": price_stats.std_dev if price_stats.count else "N/A",
+            "p25": price_stats.percentile(25) if price_stats.count else "N/A",
+            "median": price_stats.percentile(50) if price_stats.count else "N/A",
+            "p75": price_stats.percentile(75) if price_stats.count else "N/A",
         },
     }
+    if not price_stats.exact:
+        # Past PriceStats.exact_limit prices, segments and percentiles come
+        # from buckets with 1% relative accuracy
+        price_insights["approximate"] = ["price_segments", "price_distribution"]
 
-    # Feature Analysis
-    feature_keywords = {
-        "material": [
-            "material",
-            "tela",
-            "algodón",
-            "poliéster",
-            "cuero",
-            "plástico",
-            "metal",
-            "madera",
-            "acero",
-            "aluminio",
-            "fibra",
-            "sintético",
-            "natural",
-        ],
-        "size": [
-            "talle",
-            "tamaño",
-            "medida",
-            "dimensiones",
-            "largo",
-            "ancho",
-            "alto",
-            "profundidad",
-            "peso",
-            "capacidad",
-            "volumen",
-        ],
-        "color": [
-            "color",
-            "colores",
-            "tono",
-            "multicolor",
-            "estampado",
-            "diseño",
-            "patrón",
-            "motivo",
-        ],
-        "brand": [
-            "marca",
-            "original",
-            "genuino",
-            "auténtico",
-            "oficial",
-            "certificado",
-        ],
-        "condition": [
-            "nuevo",
-            "usado",
-            "reacondicionado",
-            "restaurado",
-            "seminuevo",
-            "como nuevo",
-        ],
-        "warranty": [
-            "garantía",
-            "garantizado",
-            "devolución",
-            "cambio",
-            "servicio técnico",
-            "soporte",
-        ],
-        "shipping": [
-            "envío",
-            "entrega",
-            "gratis",
-            "gratuito",
-            "sin cargo",
-            "retiro",
-            "pickup",
-            "sucursal",
-        ],
-        "package": [
-            "incluye",
-            "contenido",
-            "accesorios",
-            "manual",
-            "instrucciones",
-            "caja",
-            "embalaje",
-        ],
-        "quality": [
-            "calidad",
-            "premium",
-            "resistente",
-            "durable",
-            "robusto",
-            "fuerte",
-            "resistencia",
-        ],
-        "design": [
-            "diseño",
-            "estilo",
-            "moderno",
-            "clásico",
-            "elegante",
-            "exclusivo",
-            "único",
-        ],
-        "comfort": [
-            "cómodo",
-            "ergonómico",
-            "suave",
-            "flexible",
-            "adaptable",
-            "ajustable",
-        ],
-        "safety": [
-            "seguro",
-            "certificado",
-            "normas",
-            "estándar",
-            "aprobado",
-            "testeado",
-        ],
-        "maintenance": [
-            "mantenimiento",
-            "limpieza",
-            "cuidado",
-            "lavado",
-            "conservación",
-        ],
-        "compatibility": [
-            "compatible",
-            "universal",
-            "adaptador",
-            "conexión",
-            "acoplamiento",
-        ],
-        "sustainability": [
-            "ecológico",
-            "sustentable",
-            "reciclable",
-            "biodegradable",
-            "ambiental",
-        ],
-    }
-
-    feature_analysis = {}
-    for category, keywords in feature_keywords.items():
-        mentions = 0
-        for desc in all_descriptions_text:
-            for keyword in keywords:
-                if keyword.lower() in desc.lower():
-                    mentions += 1
-        feature_analysis[category] = mentions
-
-    # Enhanced Sentiment Analysis
-    def analyze_sentiment_by_category(text_list, categories):
-        results = {}
-        for category in categories:
-            category_text = " ".join(
-                [
-                    t
-                    for t in text_list
-                    if any(kw in t.lower() for kw in categories[category])
-                ]
-            )
-            sentiment = analyze_sentiment(category_text)
-            results[category] = sentiment
-        return results
-
-    sentiment_categories = {
-        "quality": ["calidad", "durabilidad", "resistente", "premium"],
-        "performance": ["rápido", "velocidad", "rendimiento", "eficiente"],
-        "value": ["precio", "valor", "económico", "caro", "barato"],
-        "usability": ["fácil", "sencillo", "intuitivo", "complicado", "difícil"],
-    }
+    # Enhanced Sentiment Analysis, scored once per review
+    def analyze_sentiment_by_category(review_categories):
+        return {
+            category: aggregate.summary()
+            for category, aggregate in review_categories.items()
+        }
 
     # Detailed sentiment analysis for reviews
-    reviews_sentiment = analyze_sentiment(" ".join(all_reviews_text))
+    reviews_aggregate = state["reviews"]
+    reviews_sentiment = reviews_aggregate.summary()
 
     sentiment_analysis = {
-        "overall": {"reviews": reviews_sentiment},
+        "overall": {
+            "reviews": reviews_sentiment,
+            "review_distribution": reviews_aggregate.distribution(),
+        },
         "by_category": {
-            "reviews": analyze_sentiment_by_category(
-                all_reviews_text, sentiment_categories
-            ),
+            "reviews": analyze_sentiment_by_category(state["review_categories"]),
         },
     }
 
     # Enhanced Customer Feedback Analysis
     customer_feedback = {
-        "reviews": extract_customer_feedback(all_reviews_text),
+        "reviews": state["feedback"],
     }
 
     # Competitive Analysis
     competitive_analysis = {
         "category_distribution": dict(category_distribution),
         "price_positioning": {
-            "market_average": sum(price_data) / len(price_data)
-            if price_data
-            else "N/A",
+            "market_average": avg_price if price_stats.count else "N/A",
             "price_competitiveness": "high"
-            if price_data and min(price_data) < sum(price_data) / len(price_data) * 0.9
+            if price_stats.count and price_stats.min < avg_price * 0.9
             else "low",
         },
     }
@@ -1365,6 +4002,344 @@ def save_to_json(data, filename):
     print(f"Data saved to {filename}")
 
 
+# Column order of CSV exports, stable across runs
+PRODUCT_FIELDS = [
+    "url",
+    "price",
+    "category_path",
+    "description",
+    "num_sales",
+    "review_snippets",
+    "location",
+    "product_reviews_summary",
+    "title",
+]
+
+
+def typed_product(product):
+    """
+    ``product`` (a ``ProductRecord``) as one row of typed columns, in
+    ``PRODUCT_FIELDS`` order: a float price, an int ``num_sales``, a list of
+    review snippets and None wherever the value is missing.
+    """
+    row = {field: getattr(product, field) for field in PRODUCT_FIELDS}
+    row["review_snippets"] = list(product.review_snippets)
+    return row
+
+
+def product_schema():
+    """Arrow schema of the rows ``typed_product`` returns."""
+    types = {
+        "price": pa.float64(),
+        "num_sales": pa.int64(),
+        "review_snippets": pa.list_(pa.string()),
+    }
+    return pa.schema(
+        [(field, types.get(field, pa.string())) for field in PRODUCT_FIELDS]
+    )
+
+
+class ProductSink:
+    """
+    Writes products to JSON Lines as they are scraped, and to CSV, Parquet and
+    a ``ProductStore`` when given; ``finalize()`` writes the indented JSON.
+    """
+
+    def __init__(
+        self,
+        jsonl_path,
+        csv_path=None,
+        sync_every=20,
+        parquet_path=None,
+        row_group_size=1000,
+        store=None,
+        keyword=None,
+    ):
+        self.jsonl_path = jsonl_path
+        self.csv_path = csv_path
+        self.parquet_path = parquet_path
+        self.sync_every = max(1, sync_every)
+        self.row_group_size = max(1, row_group_size)
+        self.store = store
+        self.keyword = keyword
+        self.count = 0
+        self._offset = 0
+        self._files = None
+        self._jsonl = None
+        self._csv_file = None
+        self._csv = None
+        self._parquet = None
+        self._rows = []
+
+    def open(self):
+        """Creates the output files, replacing earlier ones."""
+        with ExitStack() as files:
+            self._jsonl = files.enter_context(
+                open(self.jsonl_path, "w", encoding="utf-8", newline="")
+            )
+            if self.csv_path:
+                self._csv_file = files.enter_context(
+                    open(self.csv_path, "w", newline="", encoding="utf-8")
+                )
+            self._files = files.pop_all()
+        self._offset = 0
+        if self._csv_file:
+            self._csv = csv.DictWriter(
+                self._csv_file, PRODUCT_FIELDS, extrasaction="ignore"
+            )
+            self._csv.writeheader()
+        if self.parquet_path:
+            self._parquet = pq.ParquetWriter(
+                self.parquet_path, product_schema(), compression="zstd"
+            )
+        return self
+
+    def write(self, product):
+        """
+        Appends one ``ProductRecord`` and returns its location, a
+        ``(jsonl_path, byte offset)`` pair.
+        """
+        data = product.to_dict()
+        line = json.dumps(data, ensure_ascii=False) + "\n"
+        location = (self.jsonl_path, self._offset)
+        self._jsonl.write(line)
+        self._offset += len(line.encode("utf-8"))
+        if self._csv:
+            self._csv.writerow(data)
+        if self._parquet:
+            self._rows.append(typed_product(product))
+            if len(self._rows) >= self.row_group_size:
+                self._write_row_group()
+        if self.store:
+            self.store.add(self.keyword, product)
+        self.count += 1
+        if self.count % self.sync_every == 0:
+            self.sync()
+        return location
+
+    def _write_row_group(self):
+        self._parquet.write_table(
+            pa.Table.from_pylist(self._rows, schema=product_schema())
+        )
+        self._rows = []
+
+    def sync(self):
+        """Flushes buffered products and fsyncs the files."""
+        for f in (self._jsonl, self._csv_file):
+            if f:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def close(self):
+        """Syncs and closes the output files."""
+        if self._jsonl is None:
+            return
+        self.sync()
+        self._files.close()
+        if self.store:
+            self.store.flush()
+        if self._parquet:
+            if self._rows:
+                self._write_row_group()
+            self._parquet.close()
+        self._jsonl = self._csv_file = self._csv = self._parquet = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def finalize(self, json_path):
+        """Writes every product in the JSON Lines file to ``json_path`` as indented JSON."""
+        self.close()
+        with (
+            open(self.jsonl_path, encoding="utf-8") as src,
+            open(json_path, "w", encoding="utf-8") as dst,
+        ):
+            first = True
+            for line in src:
+                if not line.strip():
+                    continue
+                product = json.dumps(json.loads(line), ensure_ascii=False, indent=4)
+                dst.write("[\n" if first else ",\n")
+                dst.write("\n".join("    " + row for row in product.split("\n")))
+                first = False
+            dst.write("[]" if first else "\n]")
+        print(f"Data saved to {json_path}")
+
+
+def read_product(location):
+    """Reads back the product ``ProductSink.write()`` stored at ``location``."""
+    path, offset = location
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return ProductRecord.from_dict(json.loads(f.readline()))
+
+
+def read_products(jsonl_path, size=INSIGHTS_SLICE_SIZE):
+    """Yields the products of a JSON Lines file in lists of up to ``size``."""
+    with open(jsonl_path, encoding="utf-8") as f:
+        records = (
+            ProductRecord.from_dict(json.loads(line)) for line in f if line.strip()
+        )
+        yield from product_slices(records, size)
+
+
+# --- SQLite Storage ---
+
+# Columns of the products table after the key; ``price`` and ``num_sales`` are
+# numeric and ``review_snippets`` holds a JSON list
+STORE_FIELDS = [field for field in PRODUCT_FIELDS if field != "url"]
+
+
+class ProductStore:
+    """
+    SQLite history of scraped products across runs.
+
+    Every product is stored once per item, keyword and run, keyed by
+    ``item_key`` (the canonical MercadoLibre item ID), with the run's UTC
+    start time in ``run_at``. Rows are buffered and written with one
+    ``executemany`` per transaction every ``batch_size`` products and on
+    ``flush()``; the database runs in WAL mode so it can be queried while a
+    run is writing to it. ``select()`` reads products back as
+    ``ProductRecord`` objects, ready for ``extract_insights``.
+
+    With ``read_only=True`` the database is opened read-only and left
+    untouched: no schema or journal mode changes, and ``add()`` fails.
+    """
+
+    def __init__(self, path, run_at=None, batch_size=500, read_only=False):
+        self.path = path
+        self.run_at = run_at or datetime.now(UTC).isoformat(timespec="seconds")
+        self.batch_size = max(1, batch_size)
+        self.count = 0
+        self._rows = []
+        if read_only:
+            uri = f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True)
+            self._conn.row_factory = sqlite3.Row
+            return
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    item_id TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    run_at TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    price REAL,
+                    category_path TEXT,
+                    description TEXT,
+                    num_sales INTEGER,
+                    review_snippets TEXT NOT NULL DEFAULT '[]',
+                    location TEXT,
+                    product_reviews_summary TEXT,
+                    title TEXT,
+                    PRIMARY KEY (item_id, keyword, run_at)
+                );
+                CREATE INDEX IF NOT EXISTS products_keyword_run
+                    ON products (keyword, run_at);
+                CREATE INDEX IF NOT EXISTS products_run ON products (run_at);
+                """
+            )
+
+    def add(self, keyword, product):
+        """Queues one ``ProductRecord`` seen for ``keyword`` in this run."""
+        self._rows.append(
+            (
+                item_key(product.url),
+                keyword,
+                self.run_at,
+                product.url,
+                *(
+                    json.dumps(product.review_snippets, ensure_ascii=False)
+                    if field == "review_snippets"
+                    else getattr(product, field)
+                    for field in STORE_FIELDS
+                ),
+            )
+        )
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the queued products in one transaction."""
+        if not self._rows:
+            return
+        columns = ["item_id", "keyword", "run_at", "url", *STORE_FIELDS]
+        # A resumed or repeated product replaces its row for this run
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO products ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                self._rows,
+            )
+        self.count += len(self._rows)
+        self._rows = []
+
+    def query(self, sql, params=()):
+        """
+        Yields a ``ProductRecord`` for every row of a SELECT over the
+        products table; rows need ``url`` and may have any ``STORE_FIELDS``.
+        """
+        cursor = self._conn.execute(sql, params)
+        names = [field for field, *_ in cursor.description if field in STORE_FIELDS]
+        for row in cursor:
+            fields = {field: row[field] for field in names}
+            if "review_snippets" in fields:
+                fields["review_snippets"] = json.loads(fields["review_snippets"])
+            yield ProductRecord(row["url"], **fields)
+
+    def select(self, keywords=None, since=None, until=None, latest=True):
+        """
+        Yields the stored products matching the filters, oldest run first.
+
+        ``keywords`` limits the selection to those keywords and ``since`` and
+        ``until`` (ISO dates or times, UTC) to runs in ``[since, until)``.
+        With ``latest``, only the most recent row of each item is kept.
+        """
+        clauses, params = [], []
+        if keywords:
+            clauses.append(f"keyword IN ({', '.join('?' * len(keywords))})")
+            params.extend(keywords)
+        if since:
+            clauses.append("run_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("run_at < ?")
+            params.append(until)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        columns = ", ".join(["url", *STORE_FIELDS])
+        if latest:
+            sql = (
+                f"SELECT {columns} FROM (SELECT {columns}, run_at, rowid AS row_id, "
+                "ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY run_at DESC) AS n "
+                f"FROM products{where}) WHERE n = 1 ORDER BY run_at, row_id"
+            )
+        else:
+            sql = f"SELECT {columns} FROM products{where} ORDER BY run_at, rowid"
+        return self.query(sql, params)
+
+    def close(self):
+        """Writes the queued products and closes the database."""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
 # --- CLI Interface ---
 
 import argparse
@@ -1374,8 +4349,17 @@ async def main_async():
     parser = argparse.ArgumentParser(
         description="Mercado Libre Scraper and Marketing Insights Tool"
     )
-    parser.add_argument(
-        "--keyword", type=str, required=True, help="Keyword to search on Mercado Libre"
+    keywords = parser.add_mutually_exclusive_group()
+    keywords.add_argument(
+        "--keyword", type=str, help="Keyword to search on Mercado Libre"
+    )
+    keywords.add_argument(
+        "--keywords-file",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Scrape every keyword in FILE (one per line) in one run; output "
+        "and insights file names get the keyword appended",
     )
     parser.add_argument(
         "--pages", type=int, default=1, help="Number of search result pages to scrape"
@@ -1392,6 +4376,44 @@ async def main_async():
         default="mercadolibre_products.json",
         help="Output JSON filename",
     )
+    parser.add_argument(
+        "--output_jsonl",
+        type=str,
+        default=None,
+        help="JSON Lines file products are appended to as they are scraped "
+        "(default: --output_json with a .jsonl extension)",
+    )
+    parser.add_argument(
+        "--output_parquet",
+        type=str,
+        default=None,
+        help="Also write products to a Parquet file with typed columns "
+        "(requires pyarrow)",
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=str,
+        default=None,
+        metavar="DB",
+        help="Also store every product of the run in an SQLite database, "
+        "with the keyword and run time",
+    )
+    parser.add_argument(
+        "--insights-from-sqlite",
+        type=str,
+        default=None,
+        metavar="DB",
+        help="Don't scrape: compute insights from the latest stored row of "
+        "every product in DB, optionally limited by --keyword, "
+        "--keywords-file and --since",
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="With --insights-from-sqlite, only use runs from this UTC date "
+        "or time on (e.g. 2024-05-01)",
+    )
     parser.add_argument(
         "--insights_json",
         type=str,
@@ -1404,75 +4426,386 @@ async def main_async():
         default=3,
         help="Number of concurrent product page scrapes",
     )
+    parser.add_argument(
+        "--http-concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of search page requests in flight",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="Sustained requests per second allowed per host",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=3,
+        help="Requests per host that may be sent back-to-back when budget allows",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory for the on-disk response cache (disabled when omitted)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=24 * 60 * 60,
+        help="Seconds before a cached page is fetched again",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=500,
+        help="Size limit of the cache directory; least recently used pages are evicted",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=["auto", "selectolax", "lxml", "bs4"],
+        default="auto",
+        help="HTML parser for search pages (auto: fastest installed)",
+    )
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Save every search response and rendered product page to DIR",
+    )
+    recording.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Serve search and product pages from a --record directory; no network",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=None,
+        help="Journal of finished search pages and products "
+        "(default: --output_json with a .checkpoint.jsonl extension)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint: finished work "
+        "is skipped and only failed pages and products are retried",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to compute the marketing insights",
+    )
+    parser.add_argument(
+        "--browsers",
+        type=int,
+        default=1,
+        help="Number of Chromium instances in the browser pool",
+    )
+    parser.add_argument(
+        "--contexts-per-browser",
+        type=int,
+        default=None,
+        help="Browser contexts per Chromium instance "
+        "(default: --concurrency divided by --browsers, rounded up)",
+    )
+    parser.add_argument(
+        "--browser-only",
+        action="store_true",
+        help="Render every product page in the browser instead of trying "
+        "a plain HTTP fetch first",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Block images, fonts, media and third-party hosts on product pages "
+        "and extract as soon as the title and description are present",
+    )
 
     args = parser.parse_args()
+    if args.output_parquet and pa is None:
+        parser.error("--output_parquet requires pyarrow (pip install pyarrow)")
+    if args.insights_from_sqlite:
+        insights_from_store(args)
+        return
+    if not (args.keyword or args.keywords_file):
+        parser.error("one of the arguments --keyword --keywords-file is required")
+
+    if args.keywords_file:
+        keywords = read_keywords(args.keywords_file)
+        slugs = {}
+        for keyword in keywords:
+            other = slugs.setdefault(keyword_slug(keyword), keyword)
+            if other != keyword:
+                parser.error(
+                    f"keywords {other!r} and {keyword!r} in {args.keywords_file} "
+                    "would write to the same output files"
+                )
+        print(
+            f"Starting Mercado Libre Scraper for {len(keywords)} keyword(s) "
+            f"from {args.keywords_file}, pages: {args.pages}"
+        )
+    else:
+        keywords = [args.keyword]
+        print(
+            f"Starting Mercado Libre Scraper for keyword: {args.keyword}, pages: {args.pages}"
+        )
 
+    # One request budget per host, shared by search fetches and product pages
+    rate_limiter = RateLimiter(rate=args.rate, burst=args.burst)
+    cache = (
+        ResponseCache(
+            args.cache_dir,
+            ttl=args.cache_ttl,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024),
+        )
+        if args.cache_dir and not args.replay
+        else None
+    )
+    recorder = ResponseCache(args.record) if args.record else None
+    replay = ResponseCache(args.replay) if args.replay else None
+    replay_server = ReplayServer(replay).start() if replay else None
+
+    http_client = await HttpClient(
+        max_in_flight=args.http_concurrency,
+        rate_limiter=rate_limiter,
+        cache=cache,
+        recorder=recorder,
+        replay=replay,
+    ).start()
+    # One browser pool for the whole run; pages are leased per product and
+    # browsers are only launched if a product page needs rendering
+    pool = BrowserPool(
+        num_browsers=args.browsers,
+        contexts_per_browser=args.contexts_per_browser
+        or math.ceil(args.concurrency / max(1, args.browsers)),
+        fast=args.fast,
+        rate_limiter=rate_limiter,
+        cache=cache,
+        recorder=recorder,
+        replay_server=replay_server,
+    )
+    fetcher = None if args.browser_only else TieredFetcher(http_client, pool)
+    checkpoint = Checkpoint(
+        args.checkpoint or os.path.splitext(args.output_json)[0] + ".checkpoint.jsonl",
+        resume=args.resume,
+    )
+    if args.resume:
+        checkpoint.print_stats()
+    store = ProductStore(args.sqlite) if args.sqlite else None
+    # Products enriched so far, by item; shared by every keyword of the run
+    known = {}
+    totals = Counter()
+    try:
+        for keyword in keywords:
+            if args.keywords_file:
+                print(f"\n=== {keyword} ===")
+            await run_keyword(
+                keyword,
+                args,
+                keyword_outputs(args, keyword if args.keywords_file else None),
+                http_client,
+                pool,
+                fetcher,
+                checkpoint,
+                known,
+                totals,
+                store,
+            )
+    finally:
+        # Also runs on Ctrl-C, so the checkpoint is complete for --resume
+        checkpoint.close()
+        if store:
+            store.close()
+        await pool.close()
+        await http_client.close()
+
+    if fetcher:
+        fetcher.print_stats()
+    pool.print_page_stats()
     print(
-        f"Starting Mercado Libre Scraper for keyword: {args.keyword}, pages: {args.pages}"
+        f"Duplicate listings skipped: {totals['duplicates']} product page(s) not scraped"
     )
+    if len(keywords) > 1:
+        print(
+            f"Products shared between keywords: {totals['shared']} product page(s) "
+            "not scraped again"
+        )
+    if store:
+        print(f"{store.count} product(s) stored in {args.sqlite} (run {store.run_at})")
+    if replay_server:
+        replay_server.close()
+    if cache:
+        cache.print_stats()
+    if recorder:
+        print(f"Recorded pages saved to {args.record}")
+    if rate_limiter.throttled:
+        print(f"Server asked us to slow down {rate_limiter.throttled} time(s).")
+    print("Scraping and analysis complete.")
 
-    # Step 1: Scrape search results
-    products_data = scrape_search_results(args.keyword, args.pages)
 
-    # Step 2: Scrape product detail pages and enrich data
-    if products_data:
-        print("Scraping product detail pages...")
-        enriched_products_data = []
+def insights_from_store(args):
+    """Computes and saves insights from products stored by earlier runs."""
+    if args.keywords_file:
+        keywords = read_keywords(args.keywords_file)
+    else:
+        keywords = [args.keyword] if args.keyword else None
+    if not os.path.exists(args.insights_from_sqlite):
+        print(f"No database at {args.insights_from_sqlite}.")
+        return
+    loaded = 0
+
+    def counted(products):
+        nonlocal loaded
+        for product in products:
+            loaded += 1
+            yield product
 
-        # Process products in batches to avoid overwhelming the server
-        for i in range(0, len(products_data), args.concurrency):
-            batch = products_data[i : i + args.concurrency]
-            tasks = []
+    # Products are aggregated as they are read, a slice at a time
+    with ProductStore(args.insights_from_sqlite, read_only=True) as store:
+        print("Analyzing data and extracting marketing insights...")
+        state = reduce_insights(
+            product_slices(counted(store.select(keywords, since=args.since))),
+            args.workers,
+        )
+    print(f"Loaded {loaded} product(s) from {args.insights_from_sqlite}")
+    if not loaded:
+        print("No product data to analyze.")
+        return
+    save_to_json(build_insights(state), args.insights_json)
 
-            for product in batch:
-                print(
-                    f"Processing product {i + 1}/{len(products_data)}: {product['url']}"
-                )
-                tasks.append(scrape_product_page(product["url"]))
-
-            # Wait for all tasks in the batch to complete
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Process results and handle any exceptions
-            for product, result in zip(batch, batch_results):
-                if isinstance(result, Exception):
-                    print(f"Error processing {product['url']}: {str(result)}")
-                    enriched_products_data.append(
-                        product
-                    )  # Keep original data if scraping fails
-                else:
-                    # Merge product details with existing search result data
-                    enriched_product = {**product, **result}
-                    enriched_products_data.append(enriched_product)
 
-            # Add delay between batches to avoid rate limiting
-            if i + args.concurrency < len(products_data):
-                await asyncio.sleep(random.uniform(2, 4))
+def read_keywords(path):
+    """Keywords in ``path``, one per line; blank lines and # comments are skipped."""
+    keywords = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            keyword = line.strip()
+            if keyword and not keyword.startswith("#") and keyword not in keywords:
+                keywords.append(keyword)
+    return keywords
 
-        products_data = enriched_products_data
 
-        # Step 3: Analyze and Extract Insights
-        print("Analyzing data and extracting marketing insights...")
-        marketing_insights = extract_insights(products_data)
+def keyword_slug(keyword):
+    """The part of batch output file names that identifies ``keyword``."""
+    return re.sub(r"\W+", "_", keyword.lower()).strip("_") or "keyword"
 
-        # Save insights
-        save_to_json(marketing_insights, args.insights_json)
-    else:
-        print("No product data to analyze.")
 
-    # Step 4: Save scraped data
-    if products_data:
-        save_to_csv(products_data, args.output_csv)
-        save_to_json(products_data, args.output_json)
-    else:
+def keyword_outputs(args, keyword=None):
+    """
+    Output file names for one keyword of the run.
+
+    With a ``keyword`` (batch mode), a slug of it is added to each name
+    given on the command line: products.json becomes products_tv_led.json.
+    """
+    outputs = {
+        "csv": args.output_csv,
+        "json": args.output_json,
+        "jsonl": args.output_jsonl or os.path.splitext(args.output_json)[0] + ".jsonl",
+        "insights": args.insights_json,
+        "parquet": args.output_parquet,
+    }
+    if keyword is None:
+        return outputs
+    slug = keyword_slug(keyword)
+    return {
+        kind: f"{os.path.splitext(path)[0]}_{slug}{os.path.splitext(path)[1]}"
+        if path
+        else None
+        for kind, path in outputs.items()
+    }
+
+
+async def run_keyword(
+    keyword,
+    args,
+    outputs,
+    http_client,
+    pool,
+    fetcher,
+    checkpoint,
+    known,
+    totals,
+    store=None,
+):
+    """
+    Searches one keyword, scrapes its product pages and writes its outputs,
+    including ``store`` when given.
+
+    Products in ``known`` were already scraped for an earlier keyword and
+    are reused. Enriched products are not kept in memory: they go to the
+    output files as they are done, and insights are computed from the JSON
+    Lines file. Duplicate listings and products shared with earlier keywords
+    are counted in ``totals``.
+    """
+    # Step 1: Scrape search results
+    products_data = await scrape_search_results(
+        keyword, args.pages, http_client, args.parser, checkpoint
+    )
+    # The same item shows up under several URLs (sponsored slots, catalog
+    # pages, tracking parameters); render each one only once
+    products_data, duplicates = dedupe_products(products_data)
+    totals["duplicates"] += duplicates
+    if duplicates:
+        print(
+            f"Dropped {duplicates} duplicate listing(s), "
+            f"{len(products_data)} unique product(s) left"
+        )
+    if not products_data:
+        print("No product data to analyze.")
         print("No products scraped to save.")
+        return
+    totals["shared"] += sum(item_key(product.url) in known for product in products_data)
+
+    # Step 2: Scrape product detail pages and enrich data; each product is
+    # written out as soon as it is done
+    print("Scraping product detail pages...")
+    sink = ProductSink(
+        outputs["jsonl"],
+        outputs["csv"],
+        parquet_path=outputs.get("parquet"),
+        store=store,
+        keyword=keyword,
+    )
+    with sink:
+        await scrape_product_pages(
+            products_data,
+            pool,
+            args.concurrency,
+            fetcher,
+            sink,
+            checkpoint,
+            known,
+        )
+    del products_data
 
-    print("Scraping and analysis complete.")
+    # Step 3: Analyze and Extract Insights, reading the written products back
+    # a slice at a time
+    print("Analyzing data and extracting marketing insights...")
+    marketing_insights = build_insights(
+        reduce_insights(read_products(sink.jsonl_path), args.workers)
+    )
+    save_to_json(marketing_insights, outputs["insights"])
+
+    # Step 4: Save scraped data (the CSV and JSON Lines files are complete)
+    print(f"Data saved to {outputs['csv']} and {sink.jsonl_path}")
+    if sink.parquet_path:
+        print(f"Data saved to {sink.parquet_path}")
+    sink.finalize(outputs["json"])
 
 
 def main():
     """Entry point for the script."""
-    asyncio.run(main_async())
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        print("Interrupted; run again with --resume to continue.")
 
 
 if __name__ == "__main__":